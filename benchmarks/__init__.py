@@ -0,0 +1 @@
+"""Simulator and benchmarks for the APsystems local API integration."""
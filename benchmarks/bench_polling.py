@@ -0,0 +1,173 @@
+"""Benchmark the polling pipeline of the integration against simulated inverters.
+
+Boots a minimal Home Assistant instance, adds one config entry per simulated
+inverter and reports poll latency percentiles, state writes per minute,
+event loop lag and CPU time per poll cycle. The simulator runs in the same
+process, so the CPU figures include its share and are meant for comparing
+runs against each other.
+
+Run from the repository root with Home Assistant installed::
+
+    python -m benchmarks.bench_polling --inverters 50 --interval 5 --duration 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+from homeassistant import bootstrap, config_entries, loader
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+
+from .simulator import EZ1Simulator, SimulatorOptions, add_simulator_arguments
+
+DOMAIN = "apsystemsapi_local"
+COMPONENT = Path(__file__).parent.parent / "custom_components" / DOMAIN
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Return the given percentile of the values, 0 if there are none."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def async_start_hass(config_dir: str) -> HomeAssistant:
+    """Start a minimal Home Assistant instance with the integration available."""
+    os.makedirs(os.path.join(config_dir, "custom_components"))
+    os.symlink(COMPONENT, os.path.join(config_dir, "custom_components", DOMAIN))
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    hass.config.latitude, hass.config.longitude = 0.0, 0.0
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    return hass
+
+
+async def async_measure_loop_lag(lags: list[float], period: float = 0.05) -> None:
+    """Record how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(period)
+        lags.append(loop.time() - start - period)
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, float]:
+    """Run one benchmark and return the collected figures."""
+    simulator = EZ1Simulator(
+        args.inverters,
+        SimulatorOptions(
+            latency=args.latency,
+            timeout_rate=args.timeout_rate,
+            dropout_rate=args.dropout_rate,
+            night=args.night,
+            hang=args.hang,
+        ),
+    )
+    await simulator.start()
+    hass = await async_start_hass(tempfile.mkdtemp())
+
+    for host in simulator.hosts:
+        entry = config_entries.ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title=host,
+            data={
+                "ip_address": host,
+                "name": host.replace(".", "_"),
+                "check": False,
+                "update_interval": args.interval,
+                "adaptive_polling": False,
+                "fleet_mode": args.fleet,
+                "fast_transport": args.fast_transport,
+            },
+            source=config_entries.SOURCE_USER,
+            options={},
+        )
+        await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+
+    latencies: list[float] = []
+    for entry_data in hass.data[DOMAIN].values():
+        coordinator = entry_data["COORDINATOR"]
+        fetch = coordinator.async_fetch
+
+        async def timed_fetch(fetch=fetch) -> bool:
+            start = time.perf_counter()
+            try:
+                return await fetch()
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+        coordinator.async_fetch = timed_fetch
+
+    state_writes = 0
+
+    def count_state_write(_event) -> None:
+        nonlocal state_writes
+        state_writes += 1
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, count_state_write)
+    lags: list[float] = []
+    lag_task = asyncio.create_task(async_measure_loop_lag(lags))
+
+    requests_before = simulator.request_count()
+    cpu_start = time.process_time()
+    await asyncio.sleep(args.duration)
+    cpu = time.process_time() - cpu_start
+    requests = simulator.request_count() - requests_before
+
+    lag_task.cancel()
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_stop(force=True)
+    await simulator.stop()
+
+    cycles = args.duration / args.interval
+    return {
+        "polls": len(latencies),
+        "requests": requests,
+        "poll_latency_p50_ms": percentile(latencies, 50) * 1000,
+        "poll_latency_p95_ms": percentile(latencies, 95) * 1000,
+        "poll_latency_p99_ms": percentile(latencies, 99) * 1000,
+        "state_writes_per_minute": state_writes * 60 / args.duration,
+        "loop_lag_p50_ms": percentile(lags, 50) * 1000,
+        "loop_lag_p99_ms": percentile(lags, 99) * 1000,
+        "loop_lag_max_ms": max(lags, default=0.0) * 1000,
+        "cpu_ms_per_poll_cycle": cpu * 1000 / cycles,
+        "cpu_ms_per_poll": cpu * 1000 / len(latencies) if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_simulator_arguments(parser)
+    parser.add_argument("--interval", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--hang", type=float, default=30.0)
+    parser.add_argument("--fleet", action="store_true")
+    parser.add_argument("--fast-transport", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    results = asyncio.run(async_run(args))
+    width = max(len(name) for name in results)
+    for name, value in results.items():
+        print(f"{name:<{width}}  {value:10.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
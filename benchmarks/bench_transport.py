@@ -0,0 +1,107 @@
+"""Benchmark the library request path against the built-in HTTP transport.
+
+Every client polls its simulated inverter in a loop the way the coordinator
+does, fetching the output data, max power and on/off status concurrently.
+Reports polls and requests per second and CPU time per poll of both paths.
+The simulator runs in the same process with no artificial latency, so the
+figures include its share and are meant for comparing the two paths.
+
+Run from the repository root with Home Assistant installed::
+
+    python -m benchmarks.bench_transport --inverters 10 --duration 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+import time
+
+from aiohttp import ClientSession, TCPConnector
+from APsystemsEZ1 import APsystemsEZ1M
+
+from .simulator import EZ1Simulator, SimulatorOptions
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "custom_components"))
+
+from apsystemsapi_local.const import MAX_CONNECTIONS_PER_HOST  # noqa: E402
+from apsystemsapi_local.transport import EZ1Transport  # noqa: E402
+
+
+async def async_poll_loop(api, deadline: float, counter: list[int]) -> None:
+    """Poll like the coordinator until the deadline and count the polls."""
+    while time.monotonic() < deadline:
+        await asyncio.gather(
+            api.get_output_data(),
+            api.get_max_power(),
+            api.get_device_power_status(),
+        )
+        counter[0] += 1
+
+
+async def async_measure(clients: list, duration: float) -> tuple[int, float]:
+    """Poll with all clients for the duration and return the polls and CPU time."""
+    counter = [0]
+    cpu_start = time.process_time()
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(async_poll_loop(api, deadline, counter) for api in clients))
+    return counter[0], time.process_time() - cpu_start
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    """Run the benchmark of both paths and return the collected figures."""
+    simulator = EZ1Simulator(args.inverters, SimulatorOptions(latency=0, jitter=0))
+    await simulator.start()
+    results = {}
+    try:
+        sessions = [
+            ClientSession(
+                connector=TCPConnector(limit_per_host=MAX_CONNECTIONS_PER_HOST)
+            )
+            for _ in simulator.hosts
+        ]
+        library = [
+            APsystemsEZ1M(host, session=session)
+            for host, session in zip(simulator.hosts, sessions)
+        ]
+        transports = [EZ1Transport(host) for host in simulator.hosts]
+        for name, clients in (("library", library), ("transport", transports)):
+            # Open the connections before measuring.
+            await async_measure(clients, 0.5)
+            polls, cpu = await async_measure(clients, args.duration)
+            results[name] = {
+                "polls_per_second": polls / args.duration,
+                "requests_per_second": 3 * polls / args.duration,
+                "cpu_ms_per_poll": cpu * 1000 / polls if polls else 0.0,
+            }
+        for transport in transports:
+            transport.close()
+        for session in sessions:
+            await session.close()
+    finally:
+        await simulator.stop()
+    return results
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--inverters", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    results = asyncio.run(async_run(args))
+    names = list(results["library"])
+    width = max(len(name) for name in names)
+    print(f"{'':<{width}}  {'library':>10}  {'transport':>10}")
+    for name in names:
+        print(
+            f"{name:<{width}}  {results['library'][name]:10.2f}"
+            f"  {results['transport'][name]:10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
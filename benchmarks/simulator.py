@@ -0,0 +1,217 @@
+"""Local stand-in for the EZ1 local API (port 8050).
+
+Every simulated inverter listens on its own loopback address so the
+integration can be pointed at it without any changes, e.g. ``127.0.0.2``.
+
+Run standalone with ``python -m benchmarks.simulator --inverters 5``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import math
+import random
+import time
+
+from aiohttp import web
+
+PORT = 8050
+
+
+@dataclass
+class SimulatorOptions:
+    """Behaviour of a simulated inverter."""
+
+    # Seconds the inverter takes to answer, plus a random jitter on top.
+    latency: float = 0.15
+    jitter: float = 0.05
+    # Probability that a request never gets an answer.
+    timeout_rate: float = 0.0
+    # Probability that the connection is dropped without an answer.
+    dropout_rate: float = 0.0
+    # While True the inverter is switched off and no request is answered.
+    night: bool = False
+    # Seconds a hanging request is held open before the connection is closed.
+    hang: float = 30.0
+
+
+@dataclass
+class SimulatedInverter:
+    """State of one simulated EZ1."""
+
+    host: str
+    options: SimulatorOptions
+    device_id: str
+    max_power: int = 800
+    on_off: int = 0
+    te1: float = 100.0
+    te2: float = 100.0
+    e1: float = 0.0
+    e2: float = 0.0
+    requests: dict[str, int] = field(default_factory=dict)
+    _last_energy_update: float = field(default_factory=time.monotonic)
+    _phase: float = field(default_factory=lambda: random.uniform(0, math.tau))
+
+    def power(self) -> tuple[float, float]:
+        """Return the current power of both inputs."""
+        if self.on_off:
+            return 0.0, 0.0
+        # Slow sine wave per inverter so consecutive polls see changing values.
+        level = 0.5 + 0.5 * math.sin(time.monotonic() / 60 + self._phase)
+        limit = self.max_power / 2
+        return round(limit * level, 1), round(limit * level * 0.9, 1)
+
+    def output_data(self) -> dict[str, float]:
+        """Return the getOutputData payload and advance the energy counters."""
+        p1, p2 = self.power()
+        now = time.monotonic()
+        hours = (now - self._last_energy_update) / 3600
+        self._last_energy_update = now
+        self.e1 += p1 * hours / 1000
+        self.e2 += p2 * hours / 1000
+        self.te1 += p1 * hours / 1000
+        self.te2 += p2 * hours / 1000
+        # The device only reports energy with a coarse resolution.
+        return {
+            "p1": p1,
+            "e1": round(self.e1, 2),
+            "te1": round(self.te1, 2),
+            "p2": p2,
+            "e2": round(self.e2, 2),
+            "te2": round(self.te2, 2),
+        }
+
+
+def _success(inverter: SimulatedInverter, data: dict) -> web.Response:
+    return web.json_response(
+        {"data": data, "message": "SUCCESS", "deviceId": inverter.device_id}
+    )
+
+
+async def _handle(request: web.Request) -> web.StreamResponse:
+    inverter: SimulatedInverter = request.app["inverter"]
+    options = inverter.options
+    endpoint = request.path.strip("/")
+    inverter.requests[endpoint] = inverter.requests.get(endpoint, 0) + 1
+
+    if options.night or random.random() < options.timeout_rate:
+        await asyncio.sleep(options.hang)
+        raise web.HTTPGatewayTimeout
+    if random.random() < options.dropout_rate:
+        if request.transport is not None:
+            request.transport.abort()
+        raise web.HTTPServiceUnavailable
+    await asyncio.sleep(max(0.0, options.latency + random.uniform(0, options.jitter)))
+
+    if endpoint == "getOutputData":
+        return _success(inverter, inverter.output_data())
+    if endpoint == "getMaxPower":
+        return _success(inverter, {"maxPower": str(inverter.max_power)})
+    if endpoint == "setMaxPower":
+        inverter.max_power = int(request.query["p"])
+        return _success(inverter, {"maxPower": str(inverter.max_power)})
+    if endpoint == "getOnOff":
+        return _success(inverter, {"status": str(inverter.on_off)})
+    if endpoint == "setOnOff":
+        inverter.on_off = int(request.query["status"])
+        return _success(inverter, {"status": str(inverter.on_off)})
+    if endpoint == "getAlarm":
+        return _success(inverter, {"og": "0", "isce1": "0", "isce2": "0", "oe": "0"})
+    if endpoint == "getDeviceInfo":
+        return _success(
+            inverter,
+            {
+                "deviceId": inverter.device_id,
+                "devVer": "EZ1 1.6.0",
+                "ssid": "simulator",
+                "ipAddr": inverter.host,
+                "minPower": "30",
+                "maxPower": "800",
+            },
+        )
+    raise web.HTTPNotFound
+
+
+def simulator_host(index: int) -> str:
+    """Return the loopback address of the simulated inverter with this index."""
+    return f"127.0.{index // 250}.{index % 250 + 2}"
+
+
+class EZ1Simulator:
+    """A set of simulated inverters served on loopback addresses."""
+
+    def __init__(self, count: int, options: SimulatorOptions | None = None) -> None:
+        """Initialize the simulator."""
+        self.options = options or SimulatorOptions()
+        self.inverters = [
+            SimulatedInverter(
+                host=simulator_host(index),
+                options=self.options,
+                device_id=f"E07{index:09d}",
+            )
+            for index in range(count)
+        ]
+        self._runners: list[web.AppRunner] = []
+
+    @property
+    def hosts(self) -> list[str]:
+        """Return the addresses of all simulated inverters."""
+        return [inverter.host for inverter in self.inverters]
+
+    def request_count(self) -> int:
+        """Return the number of requests received by all inverters."""
+        return sum(sum(inverter.requests.values()) for inverter in self.inverters)
+
+    async def start(self) -> None:
+        """Start serving all inverters."""
+        for inverter in self.inverters:
+            app = web.Application()
+            app["inverter"] = inverter
+            app.router.add_get("/{endpoint:.*}", _handle)
+            runner = web.AppRunner(app, access_log=None, shutdown_timeout=0.1)
+            await runner.setup()
+            await web.TCPSite(runner, inverter.host, PORT).start()
+            self._runners.append(runner)
+
+    async def stop(self) -> None:
+        """Stop serving all inverters."""
+        await asyncio.gather(*(runner.cleanup() for runner in self._runners))
+        self._runners.clear()
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    simulator = EZ1Simulator(
+        args.inverters,
+        SimulatorOptions(
+            latency=args.latency,
+            timeout_rate=args.timeout_rate,
+            dropout_rate=args.dropout_rate,
+            night=args.night,
+        ),
+    )
+    await simulator.start()
+    print("Serving simulated inverters on", ", ".join(simulator.hosts))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def add_simulator_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the simulated inverters to a parser."""
+    parser.add_argument("--inverters", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--dropout-rate", type=float, default=0.0)
+    parser.add_argument("--night", action="store_true")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_simulator_arguments(parser)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
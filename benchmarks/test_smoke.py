@@ -0,0 +1,86 @@
+"""Smoke test of one polling round against the simulated inverters.
+
+Catches the integration failing to import or set up, or depending on
+anything beyond the local simulator. Run from the repository root with
+Home Assistant installed::
+
+    python -m pytest -q benchmarks
+"""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+
+import pytest
+
+from homeassistant import config_entries
+from homeassistant.helpers import entity_registry as er
+
+from .bench_polling import DOMAIN, async_start_hass
+from .simulator import EZ1Simulator, SimulatorOptions
+
+INVERTERS = 2
+
+
+async def async_poll_once(fast_transport: bool) -> None:
+    """Set up the simulated inverters, wait for their first poll and check it."""
+    simulator = EZ1Simulator(INVERTERS, SimulatorOptions(latency=0.0, jitter=0.0))
+    await simulator.start()
+    hass = await async_start_hass(tempfile.mkdtemp())
+    try:
+        for inverter in simulator.inverters:
+            entry = config_entries.ConfigEntry(
+                version=1,
+                minor_version=1,
+                domain=DOMAIN,
+                title=inverter.host,
+                data={
+                    "ip_address": inverter.host,
+                    "name": inverter.device_id,
+                    "check": False,
+                    "update_interval": 60,
+                    "adaptive_polling": False,
+                    "fast_transport": fast_transport,
+                },
+                source=config_entries.SOURCE_USER,
+                options={},
+            )
+            await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+
+        # The first poll runs in the background after the setup.
+        coordinators = {
+            entry_data["name"]: entry_data["COORDINATOR"]
+            for entry_data in hass.data[DOMAIN].values()
+        }
+        async with asyncio.timeout(10):
+            while any(c.data is None for c in coordinators.values()):
+                await asyncio.sleep(0.05)
+        await hass.async_block_till_done()
+
+        registry = er.async_get(hass)
+        for inverter in simulator.inverters:
+            data = coordinators[inverter.device_id].data
+            assert data.device_info.deviceId == inverter.device_id
+            assert data.max_power == inverter.max_power
+            assert 0 <= data.output_data.p1 <= inverter.max_power
+            entity_id = registry.async_get_entity_id(
+                "sensor", DOMAIN, f"apsystemsapi_{inverter.device_id}_total_power"
+            )
+            state = hass.states.get(entity_id)
+            assert float(state.state) == pytest.approx(
+                data.output_data.p1 + data.output_data.p2
+            )
+            assert inverter.requests["getOutputData"] == 1
+    finally:
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop(force=True)
+        await simulator.stop()
+
+
+@pytest.mark.parametrize("fast_transport", [False, True])
+def test_poll_once(fast_transport: bool) -> None:
+    """One polling round reaches the entities with either transport."""
+    asyncio.run(async_poll_once(fast_transport))
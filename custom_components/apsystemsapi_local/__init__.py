@@ -3,61 +3,396 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import timedelta
+from collections.abc import Awaitable, Callable, Iterable
+from contextlib import suppress
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
 import logging
-from time import monotonic
+import os
+from time import monotonic, time
+from typing import TYPE_CHECKING, Any, TypeVar
 
-from aiohttp import client_exceptions
-from APsystemsEZ1 import APsystemsEZ1M, ReturnOutputData
+from aiohttp import ClientSession, TCPConnector, client_exceptions
+from APsystemsEZ1 import (
+    APsystemsEZ1M,
+    ReturnAlarmInfo,
+    ReturnDeviceInfo,
+    ReturnOutputData,
+    Status,
+)
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_IP_ADDRESS, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    CONF_IP_ADDRESS,
+    CONF_NAME,
+    EVENT_HOMEASSISTANT_STOP,
+    Platform,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, device_registry as dr, sun
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN, UPDATE_INTERVAL
+from .const import (
+    ADAPTIVE_POLLING,
+    ALARM_UPDATE_INTERVAL,
+    DATA_FLEET,
+    DATA_SITE,
+    DATA_STARTUP_LIMIT,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_MAX_SILENCE,
+    DEFAULT_MAX_TIMEOUT,
+    DEFAULT_MIN_TIMEOUT,
+    DEVICE_INFO_UPDATE_INTERVAL,
+    DOMAIN,
+    EXPORT_TARGET,
+    FAST_TRANSPORT,
+    FLEET_MODE,
+    GRID_METER,
+    HISTORY_SIZE,
+    IMPORT_STATISTICS,
+    MAX_BACKOFF_INTERVAL,
+    MAX_CONNECTIONS_PER_HOST,
+    MAX_SILENCE,
+    MAX_TIMEOUT,
+    MIN_TIMEOUT,
+    NIGHT_UPDATE_INTERVAL,
+    PERSIST_HISTORY,
+    POWER_DEADBAND,
+    POWER_DEADBAND_PERCENT,
+    POWER_THRESHOLD,
+    SAMPLING_INTERVAL,
+    SETTINGS_UPDATE_INTERVAL,
+    SITE,
+    STARTUP_CONCURRENCY,
+    UPDATE_INTERVAL,
+)
+from .breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    async_get_breaker,
+    async_release_breaker,
+)
+from .commands import ApSystemsCommandQueue
+from .derived import DerivedStatistics, PowerStatistics
+from .energy import EnergyIntegrator
+from .export import ZeroExportController, async_get_export_controller
+from .fleet import ApSystemsFleet
+from .history import SampleHistory, close_map
+from .metrics import PollMetrics
+from .sampling import OutputSampler, PowerAggregate
+from .services import async_setup_services
+from .site import SiteAggregate
+from .timeout import AdaptiveTimeout
+from .transport import EZ1Transport
+
+if TYPE_CHECKING:
+    from .energy_statistics import EnergyStatisticsImporter
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.NUMBER, Platform.SWITCH]
+_T = TypeVar("_T")
+
+PLATFORMS: list[Platform] = [
+    Platform.BINARY_SENSOR,
+    Platform.SENSOR,
+    Platform.NUMBER,
+    Platform.SWITCH,
+]
+# The site aggregate device only has sensors.
+SITE_PLATFORMS: list[Platform] = [Platform.SENSOR]
+
+# Seconds between two polls of the endpoints that rarely change, keyed by the
+# field of ApSystemsSensorData they fill. The output data is polled on every
+# update.
+STREAM_INTERVALS = {
+    "max_power": SETTINGS_UPDATE_INTERVAL,
+    "power_status": SETTINGS_UPDATE_INTERVAL,
+    "alarm_info": ALARM_UPDATE_INTERVAL,
+    "device_info": DEVICE_INFO_UPDATE_INTERVAL,
+}
+
+# Settings that change how the entry is set up, with their defaults. Changing
+# one of them in the options reloads the entry.
+RELOAD_OPTIONS = {
+    CONF_IP_ADDRESS: None,
+    FLEET_MODE: False,
+    SAMPLING_INTERVAL: 0,
+    PERSIST_HISTORY: False,
+    IMPORT_STATISTICS: False,
+    FAST_TRANSPORT: False,
+    GRID_METER: "",
+    EXPORT_TARGET: 0,
+}
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services of the integration."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
     hass.data.setdefault(DOMAIN, {})
+    if entry.data.get(SITE, False):
+        site = hass.data[DATA_SITE] = SiteAggregate(hass)
+        for entry_id, entry_data in hass.data[DOMAIN].items():
+            site.async_register(entry_id, entry_data["COORDINATOR"])
+
+        @callback
+        def async_unload_site() -> None:
+            hass.data.pop(DATA_SITE).async_shutdown()
+
+        entry.async_on_unload(async_unload_site)
+        await hass.config_entries.async_forward_entry_setups(entry, SITE_PLATFORMS)
+        return True
     # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
 
-    api = APsystemsEZ1M(ip_address=entry.data[CONF_IP_ADDRESS], timeout=8)
+    config = entry_config(entry)
+
+    request_timeout = AdaptiveTimeout(
+        config.get(MIN_TIMEOUT, DEFAULT_MIN_TIMEOUT),
+        config.get(MAX_TIMEOUT, DEFAULT_MAX_TIMEOUT),
+    )
+    api: APsystemsEZ1M | EZ1Transport
+    session: ClientSession | None = None
+    if config.get(FAST_TRANSPORT, False):
+        api = EZ1Transport(config[CONF_IP_ADDRESS], timeout=request_timeout.value)
+    else:
+        session = async_create_inverter_session()
+        api = APsystemsEZ1M(
+            ip_address=config[CONF_IP_ADDRESS],
+            timeout=request_timeout.value,
+            session=session,
+        )
+
+    async def async_close_connections(*_: Any) -> None:
+        """Close every connection to the inverter."""
+        if session is not None:
+            await session.close()
+        elif isinstance(api, EZ1Transport):
+            api.close()
+
+    entry.async_on_unload(async_close_connections)
+    # Entries are not unloaded when Home Assistant stops.
+    entry.async_on_unload(
+        hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, async_close_connections)
+    )
+    breaker = async_get_breaker(hass, config[CONF_IP_ADDRESS])
+
+    @callback
+    def async_drop_breaker() -> None:
+        async_release_breaker(hass, config[CONF_IP_ADDRESS])
+
+    # Also after a new IP address in the options, which reloads the entry.
+    entry.async_on_unload(async_drop_breaker)
     coordinator = ApSystemsDataCoordinator(
-        hass, api, interval=entry.data.get(UPDATE_INTERVAL)
+        hass,
+        api,
+        breaker,
+        request_timeout,
+        **_coordinator_options(config),
+    )
+    if config.get(FLEET_MODE, False):
+        fleet = hass.data.get(DATA_FLEET)
+        if fleet is None:
+            fleet = hass.data[DATA_FLEET] = ApSystemsFleet(hass)
+        entry.async_on_unload(fleet.async_register(coordinator))
+    # The entities turn unavailable as soon as any request trips the breaker.
+    entry.async_on_unload(
+        coordinator.breaker.async_add_listener(coordinator.async_update_listeners)
+    )
+    if sampling_interval := config.get(SAMPLING_INTERVAL, 0):
+        coordinator.sampler = OutputSampler(
+            hass,
+            api,
+            coordinator.breaker,
+            config[CONF_NAME],
+            interval=sampling_interval,
+            threshold=config.get(POWER_THRESHOLD, 0),
+            on_sample=coordinator.async_add_power_sample,
+        )
+        entry.async_on_unload(coordinator.sampler.async_start())
+    entry.async_on_unload(coordinator.commands.async_shutdown)
+    entry.async_on_unload(
+        async_track_time_change(
+            hass, coordinator.async_reset_daily_statistics, hour=0, minute=0, second=0
+        )
     )
-    hass.data[DOMAIN][entry.entry_id] = {**entry.data, "COORDINATOR": coordinator}
+    if config.get(PERSIST_HISTORY, False):
+        coordinator.history.path = _history_path(hass, entry)
+        await hass.async_add_executor_job(coordinator.history.open)
+
+        async def async_close_history() -> None:
+            if (mapped := coordinator.history.detach()) is not None:
+                await hass.async_add_executor_job(close_map, mapped)
+
+        entry.async_on_unload(async_close_history)
+    if config.get(IMPORT_STATISTICS, False):
+        if "recorder" in hass.config.components:
+            # Only imported in this mode, the recorder is optional otherwise.
+            from .energy_statistics import EnergyStatisticsImporter
+
+            coordinator.energy_statistics = EnergyStatisticsImporter(
+                hass, config[CONF_NAME]
+            )
+            await coordinator.energy_statistics.async_load()
+        else:
+            _LOGGER.warning(
+                "Not importing the energy statistics of %s without the recorder",
+                config[CONF_NAME],
+            )
+    if grid_meter := config.get(GRID_METER):
+        export_controller = async_get_export_controller(
+            hass, grid_meter, config.get(EXPORT_TARGET, 0)
+        )
+        entry.async_on_unload(export_controller.async_register(coordinator))
+    if (site := hass.data.get(DATA_SITE)) is not None:
+        site.async_register(entry.entry_id, coordinator)
+
+    @callback
+    def async_leave_site() -> None:
+        if (site := hass.data.get(DATA_SITE)) is not None:
+            site.async_unregister(entry.entry_id)
+
+    entry.async_on_unload(async_leave_site)
+    entry.async_on_unload(entry.add_update_listener(update_listener))
+    hass.data[DOMAIN][entry.entry_id] = {**config, "COORDINATOR": coordinator}
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Entities start with their restored state, so the first poll does not
+    # have to hold up the startup, e.g. while the inverter is off at night.
+    startup_limit = hass.data.get(DATA_STARTUP_LIMIT)
+    if startup_limit is None:
+        startup_limit = hass.data[DATA_STARTUP_LIMIT] = asyncio.Semaphore(
+            STARTUP_CONCURRENCY
+        )
+    entry.async_create_background_task(
+        hass,
+        coordinator.async_background_first_refresh(startup_limit),
+        f"{DOMAIN} {entry.title} first refresh",
+    )
+
     return True
 
 
+def entry_config(entry: ConfigEntry) -> dict[str, Any]:
+    """Return the settings of an entry, with the options taking precedence."""
+    return {**entry.data, **entry.options}
+
+
+def _coordinator_options(config: dict[str, Any]) -> dict[str, Any]:
+    """Return the settings a running coordinator can apply in place."""
+    return {
+        "interval": config.get(UPDATE_INTERVAL),
+        "adaptive": config.get(ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+        "power_deadband": config.get(POWER_DEADBAND, 0),
+        "power_deadband_percent": config.get(POWER_DEADBAND_PERCENT, 0),
+        "max_silence": config.get(MAX_SILENCE, DEFAULT_MAX_SILENCE),
+    }
+
+
+def async_create_inverter_session() -> ClientSession:
+    """Create a keep-alive session with a bounded connection pool per inverter."""
+    return ClientSession(
+        connector=TCPConnector(limit_per_host=MAX_CONNECTIONS_PER_HOST)
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    platforms = SITE_PLATFORMS if entry.data.get(SITE, False) else PLATFORMS
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, platforms)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN].pop(entry.entry_id, None)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the removed inverter from the site and delete its sample history."""
+    if (site := hass.data.get(DATA_SITE)) is not None:
+        site.async_remove(entry.entry_id)
+    await hass.async_add_executor_job(_remove_file, _history_path(hass, entry))
+
+
+def _history_path(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    return hass.config.path(".storage", f"{DOMAIN}.{entry.entry_id}.history")
+
+
+def _remove_file(path: str) -> None:
+    with suppress(FileNotFoundError):
+        os.remove(path)
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Update listener."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply changed options to the running entry.
+
+    Changes to RELOAD_OPTIONS reload the entry, everything else the options
+    flow offers is applied to the coordinator and its entities in place.
+    """
+    config = entry_config(entry)
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    if any(
+        config.get(key, default) != entry_data.get(key, default)
+        for key, default in RELOAD_OPTIONS.items()
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    coordinator: ApSystemsDataCoordinator = entry_data["COORDINATOR"]
+    coordinator.api.timeout = coordinator.request_timeout.set_bounds(
+        config.get(MIN_TIMEOUT, DEFAULT_MIN_TIMEOUT),
+        config.get(MAX_TIMEOUT, DEFAULT_MAX_TIMEOUT),
+    )
+    if coordinator.sampler is not None:
+        coordinator.sampler.threshold = config.get(POWER_THRESHOLD, 0)
+    coordinator.async_apply_options(**_coordinator_options(config))
+    entry_data.update(config)
 
 
 class InverterNotAvailable(Exception):
     pass
 
 
+@dataclass
+class ApSystemsSensorData:
+    """Latest values of all endpoints of the inverter.
+
+    The output data is from the last poll, the other fields are kept from
+    earlier polls until their endpoint is due again.
+    """
+
+    output_data: ReturnOutputData | None
+    max_power: int | None
+    power_status: Status | None
+    alarm_info: ReturnAlarmInfo | None = None
+    device_info: ReturnDeviceInfo | None = None
+    power_aggregate: PowerAggregate | None = None
+    statistics: DerivedStatistics | None = None
+    # Lifetime energy of both inputs, integrated between the device counter steps.
+    precise_te1: float | None = None
+    precise_te2: float | None = None
+
+
 class ApSystemsDataCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass, api: APsystemsEZ1M, interval: int = 10):
+    def __init__(
+        self,
+        hass,
+        api: APsystemsEZ1M | EZ1Transport,
+        breaker: CircuitBreaker,
+        request_timeout: AdaptiveTimeout,
+        interval: int = 10,
+        adaptive: bool = DEFAULT_ADAPTIVE_POLLING,
+        power_deadband: float = 0,
+        power_deadband_percent: float = 0,
+        max_silence: float = DEFAULT_MAX_SILENCE,
+    ):
         """Initialize my coordinator."""
         if interval is None:
             interval = 10
@@ -70,64 +405,349 @@ class ApSystemsDataCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=interval),
         )
         self.api = api
-        self.always_update = True
-
-    async def _async_update_data(self) -> ReturnOutputData | None:
-        try:
-            data = await self.api.get_output_data()
-            return data
-        except (TimeoutError, client_exceptions.ClientConnectionError):
-            # raise InverterNotAvailable
-            raise InverterNotAvailable()
+        self.breaker = breaker
+        # Shared with the sampler and the commands through the api client.
+        self.request_timeout = request_timeout
+        # Listeners are only called when the polled snapshot or availability
+        # changed; the sensors additionally filter out unchanged values.
+        self.always_update = False
+        self.adaptive = adaptive
+        self.power_deadband = power_deadband
+        self.power_deadband_percent = power_deadband_percent
+        self.max_silence = max_silence
+        self.base_interval = self.update_interval
+        self.consecutive_failures = 0
+        self.fleet: ApSystemsFleet | None = None
+        self.metrics = PollMetrics()
+        self.commands = ApSystemsCommandQueue(hass, self)
+        self.sampler: OutputSampler | None = None
+        self.export_controller: ZeroExportController | None = None
+        self.energy_statistics: EnergyStatisticsImporter | None = None
+        self.site: SiteAggregate | None = None
+        self._energy_p1 = EnergyIntegrator()
+        self._energy_p2 = EnergyIntegrator()
+        self.history = SampleHistory(HISTORY_SIZE)
+        self.statistics = PowerStatistics()
+        self._stream_fetchers: dict[str, Callable[[], Awaitable]] = {
+            "max_power": api.get_max_power,
+            "power_status": api.get_device_power_status,
+            "alarm_info": api.get_alarm_info,
+            "device_info": api.get_device_info,
+        }
+        # Monotonic time each stream is polled next, all of them on the first poll.
+        self._stream_due = dict.fromkeys(STREAM_INTERVALS, 0.0)
+        # Loop time of the slot the last poll ran in and of the next slot.
+        self._slot: float | None = None
+        self._next_slot: float | None = None
 
-    async def _async_refresh(  # noqa: C901
+    @callback
+    def async_apply_options(
         self,
-        log_failures: bool = True,
-        raise_on_auth_failed: bool = False,
-        scheduled: bool = False,
-        raise_on_entry_error: bool = False,
+        interval: int | None,
+        adaptive: bool,
+        power_deadband: float,
+        power_deadband_percent: float,
+        max_silence: float,
     ) -> None:
-        self._async_unsub_refresh()
-        self._debounced_refresh.async_cancel()
-        if self._shutdown_requested or scheduled and self.hass.is_stopping:
+        """Apply changed settings without interrupting the polling."""
+        self.adaptive = adaptive
+        self.power_deadband = power_deadband
+        self.power_deadband_percent = power_deadband_percent
+        self.max_silence = max_silence
+        self.base_interval = timedelta(seconds=10 if interval is None else interval)
+        self.update_interval = self.base_interval
+        if adaptive:
+            self._adapt_update_interval()
+        # Start the new cadence from now instead of counting overruns.
+        self._slot = None
+        if self.fleet is not None:
+            self.fleet.async_reschedule(self)
+        elif self._unsub_refresh is not None:
+            # Move the pending poll, a running one schedules the next by itself.
+            self._schedule_refresh()
+        if self.data is not None:
+            # Let the sensors publish with the new deadbands.
+            self.async_update_listeners()
+
+    @property
+    def output_data(self) -> ReturnOutputData | None:
+        """Return the output data of the last successful poll."""
+        if self.data is None:
+            return None
+        return self.data.output_data
+
+    async def _async_get_output_data(
+        self, aggregate: PowerAggregate | None
+    ) -> ReturnOutputData | None:
+        if aggregate is not None:
+            # The sampler just fetched it, no need to ask the inverter again.
+            return aggregate.latest
+        return await self._async_request(self.api.get_output_data)
+
+    async def _async_request(self, fetch: Callable[[], Awaitable[_T]]) -> _T:
+        """Send one request and adapt the timeout to its round-trip time."""
+        timeout = self.api.timeout
+        start = monotonic()
+        try:
+            result = await fetch()
+        except TimeoutError:
+            self.api.timeout = self.request_timeout.record_timeout(timeout)
+            raise
+        self.api.timeout = self.request_timeout.record_success(monotonic() - start)
+        return result
+
+    def _due_streams(self) -> list[str]:
+        now = monotonic()
+        return [stream for stream, at in self._stream_due.items() if at <= now]
+
+    async def _async_poll(
+        self, aggregate: PowerAggregate | None, due: list[str]
+    ) -> tuple[ReturnOutputData | None, dict[str, Any]]:
+        """Fetch the output data and every stream that is due."""
+        now = monotonic()
+        # One concurrent round against the inverter instead of a separate
+        # polling loop per platform.
+        output_data, *values = await asyncio.gather(
+            self._async_get_output_data(aggregate),
+            *(self._async_request(self._stream_fetchers[stream]) for stream in due),
+            return_exceptions=True,
+        )
+        # Only the output data decides whether the poll failed, the streams
+        # of a failed poll stay due for the next one.
+        if isinstance(output_data, BaseException):
+            raise output_data
+        streams: dict[str, Any] = {}
+        for stream, value in zip(due, values):
+            if isinstance(value, Exception):
+                # Keep the previous value, the stream is asked again next poll.
+                _LOGGER.debug(
+                    "Fetching %s from %s failed: %r", stream, self.api.base_url, value
+                )
+                continue
+            if isinstance(value, BaseException):
+                raise value
+            streams[stream] = value
+            self._stream_due[stream] = now + STREAM_INTERVALS[stream]
+        return output_data, streams
+
+    @callback
+    def async_mark_due(self, streams: Iterable[str]) -> None:
+        """Poll the streams again with the next update."""
+        for stream in streams:
+            self._stream_due[stream] = 0.0
+
+    async def _async_update_data(self) -> ApSystemsSensorData:
+        aggregate = self.sampler.async_aggregate() if self.sampler else None
+        due = self._due_streams()
+        try:
+            if aggregate is not None and not due:
+                # Nothing to ask the inverter, so nothing for the breaker to
+                # judge it by either.
+                output_data, streams = aggregate.latest, {}
+            else:
+                output_data, streams = await self.breaker.async_call(
+                    self._async_poll, aggregate, due
+                )
+        except (
+            CircuitOpenError,
+            TimeoutError,
+            client_exceptions.ClientConnectionError,
+        ) as err:
+            raise InverterNotAvailable() from err
+        data = replace(
+            self.data or ApSystemsSensorData(None, None, None),
+            **streams,
+            output_data=output_data,
+            power_aggregate=aggregate,
+            precise_te1=None,
+            precise_te2=None,
+        )
+        if "device_info" in streams and streams["device_info"] is not None:
+            self._async_update_device(streams["device_info"])
+        if output_data is not None:
+            if aggregate is None:
+                # Otherwise the sampler already added its samples.
+                self.async_add_power_sample(output_data)
+            data.precise_te1 = self._energy_p1.update(output_data.te1)
+            data.precise_te2 = self._energy_p2.update(output_data.te2)
+            data.statistics = self.statistics.snapshot()
+            if self.energy_statistics is not None:
+                self.energy_statistics.async_add(output_data)
+        return data
+
+    @callback
+    def _async_update_device(self, device_info: ReturnDeviceInfo) -> None:
+        """Show the serial number and firmware of the inverter on its device."""
+        if self.config_entry is None:
             return
+        device_registry = dr.async_get(self.hass)
+        device = device_registry.async_get_device(
+            identifiers={(DOMAIN, self.config_entry.data[CONF_NAME])}
+        )
+        if device is not None:
+            device_registry.async_update_device(
+                device.id,
+                serial_number=device_info.deviceId,
+                sw_version=device_info.devVer,
+            )
+
+    async def async_background_first_refresh(
+        self, startup_limit: asyncio.Semaphore
+    ) -> None:
+        """Run the first poll, limiting how many entries poll at the same time."""
+        async with startup_limit:
+            if self.fleet is not None:
+                # Through the fleet, so it can not poll the inverter meanwhile.
+                await self.fleet.async_poll(self)
+            else:
+                await self.async_refresh()
 
-        if log_timing := self.logger.isEnabledFor(logging.DEBUG):
-            start = monotonic()
+    @callback
+    def async_add_power_sample(self, output_data: ReturnOutputData) -> None:
+        """Integrate and store a freshly fetched output data sample."""
+        now = monotonic()
+        self._energy_p1.add_sample(now, output_data.p1)
+        self._energy_p2.add_sample(now, output_data.p2)
+        self.history.append(
+            time(), output_data.p1, output_data.p2, output_data.e1, output_data.e2
+        )
+        self.statistics.add(now, output_data.p1, output_data.p2)
+
+    @callback
+    def async_reset_daily_statistics(self, _now: datetime) -> None:
+        """Reset the statistics of the day at local midnight."""
+        self.statistics.reset_daily()
+        if self.data is not None:
+            # The inverter may be off at night, publish the reset right away.
+            self.data = replace(self.data, statistics=self.statistics.snapshot())
+            self.async_update_listeners()
 
-        auth_failed = False
+    @callback
+    def _adapt_update_interval(self) -> None:
+        """Stretch the polling interval at night and while the inverter is unreachable.
+
+        The configured interval is restored as soon as a poll succeeds again
+        during the day.
+        """
+        interval = self.base_interval.total_seconds()
+        if self.consecutive_failures:
+            interval = min(
+                interval * 2 ** min(self.consecutive_failures, 10),
+                MAX_BACKOFF_INTERVAL,
+            )
+        if not sun.is_up(self.hass):
+            interval = max(interval, NIGHT_UPDATE_INTERVAL)
+        self.update_interval = timedelta(seconds=interval)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll on a fixed cadence from the start of the last one.
+
+        A poll that took longer than the interval skips the slots it overran
+        instead of making the next poll start late.
+        """
+        if self.fleet is not None:
+            # Polls are scheduled by the fleet.
+            return
+        if self._update_interval_seconds is None or (
+            self.config_entry and self.config_entry.pref_disable_polling
+        ):
+            return
+        self._async_unsub_refresh()
+        loop = self.hass.loop
+        interval = self._update_interval_seconds
+        now = loop.time()
+        slot = now + interval if self._slot is None else self._slot + interval
+        if slot <= now:
+            missed = int((now - slot) // interval) + 1
+            self.metrics.record_overrun(missed)
+            slot += missed * interval
+        self._next_slot = slot
+        self._unsub_refresh = loop.call_at(
+            slot, self.hass.async_run_hass_job, self._job
+        ).cancel
+
+    async def async_fetch(self) -> bool:
+        """Poll the inverter once and return whether the listeners need an update."""
+        start = monotonic()
         previous_update_success = self.last_update_success
         previous_data = self.data
         exc_triggered = False
         try:
             self.data = await self._async_update_data()
-        except InverterNotAvailable:
+        except InverterNotAvailable as err:
             self.last_update_success = False
+            self.consecutive_failures += 1
             exc_triggered = True
+            if isinstance(err.__cause__, CircuitOpenError):
+                self.metrics.record_rejected()
+            elif isinstance(err.__cause__, TimeoutError):
+                self.metrics.record_timeout(monotonic() - start)
+            else:
+                self.metrics.record_error(monotonic() - start)
         except Exception as err:  # pylint: disable=broad-except
             self.last_exception = err
             self.last_update_success = False
+            self.consecutive_failures += 1
+            self.metrics.record_error(monotonic() - start)
             self.logger.exception("Unexpected error fetching %s data", self.name)
             exc_triggered = True
         else:
+            self.consecutive_failures = 0
+            latency = monotonic() - start
+            self.metrics.record_success(latency)
             if not self.last_update_success and not exc_triggered:
                 self.last_update_success = True
                 self.logger.info("Fetching %s data recovered", self.name)
         finally:
-            if log_timing:
-                self.logger.debug(
-                    "Finished fetching %s data in %.3f seconds (success: %s)",
-                    self.name,
-                    monotonic() - start,
-                    self.last_update_success,
-                )
-            if not auth_failed and self._listeners and not self.hass.is_stopping:
-                self._schedule_refresh()
+            self.logger.debug(
+                "Finished fetching %s data in %.3f seconds (success: %s)",
+                self.name,
+                monotonic() - start,
+                self.last_update_success,
+            )
+            if self.adaptive:
+                self._adapt_update_interval()
+        if self.site is not None and self.config_entry is not None:
+            self.site.async_update(self.config_entry.entry_id)
         if not self.last_update_success and not previous_update_success:
-            return
-        if (
+            return False
+        return (
             self.always_update
             or self.last_update_success != previous_update_success
             or previous_data != self.data
-        ):
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        start = monotonic()
+        super().async_update_listeners()
+        self.metrics.record_dispatch(monotonic() - start)
+
+    @property
+    def has_listeners(self) -> bool:
+        """Return whether any entity is subscribed to this coordinator."""
+        return bool(self._listeners)
+
+    async def _async_refresh(
+        self,
+        log_failures: bool = True,
+        raise_on_auth_failed: bool = False,
+        scheduled: bool = False,
+        raise_on_entry_error: bool = False,
+    ) -> None:
+        self._async_unsub_refresh()
+        self._debounced_refresh.async_cancel()
+        if self._shutdown_requested or scheduled and self.hass.is_stopping:
+            return
+
+        # Scheduled polls keep the cadence, others start a new one.
+        if scheduled and self._next_slot is not None:
+            self._slot = self._next_slot
+        else:
+            self._slot = self.hass.loop.time()
+        update_listeners = await self.async_fetch()
+        if self._listeners and not self.hass.is_stopping:
+            self._schedule_refresh()
+        if update_listeners:
             self.async_update_listeners()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from APsystemsEZ1 import ReturnAlarmInfo, Status
+
+from homeassistant import config_entries
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.const import CONF_NAME, STATE_ON, EntityCategory
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import ApSystemsDataCoordinator
+from .const import DOMAIN
+from .entity import ApSystemsRestoreEntity, inverter_device_info
+
+
+@dataclass(frozen=True, kw_only=True)
+class ApSystemsAlarmEntityDescription(BinarySensorEntityDescription):
+    """Describes an alarm flag of the inverter."""
+
+    value_fn: Callable[[ReturnAlarmInfo], Status]
+    device_class: BinarySensorDeviceClass | None = BinarySensorDeviceClass.PROBLEM
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+
+
+ALARMS: tuple[ApSystemsAlarmEntityDescription, ...] = (
+    ApSystemsAlarmEntityDescription(
+        key="off_grid",
+        name="Off Grid",
+        value_fn=lambda alarms: alarms.og,
+    ),
+    ApSystemsAlarmEntityDescription(
+        key="dc_1_short_circuit",
+        name="DC 1 Short Circuit",
+        value_fn=lambda alarms: alarms.isce1,
+    ),
+    ApSystemsAlarmEntityDescription(
+        key="dc_2_short_circuit",
+        name="DC 2 Short Circuit",
+        value_fn=lambda alarms: alarms.isce2,
+    ),
+    ApSystemsAlarmEntityDescription(
+        key="output_fault",
+        name="Output Fault",
+        value_fn=lambda alarms: alarms.oe,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: config_entries.ConfigEntry,
+    add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the binary sensor platform."""
+    config = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = config["COORDINATOR"]
+    device_name = config[CONF_NAME]
+    device_info = inverter_device_info(device_name)
+
+    add_entities(
+        ApSystemsAlarm(coordinator, description, device_name, device_info)
+        for description in ALARMS
+    )
+
+
+class ApSystemsAlarm(ApSystemsRestoreEntity, BinarySensorEntity):
+    """Alarm flag of an APsystems inverter, on while the alarm is raised."""
+
+    entity_description: ApSystemsAlarmEntityDescription
+
+    def __init__(
+        self,
+        coordinator: ApSystemsDataCoordinator,
+        description: ApSystemsAlarmEntityDescription,
+        device_name: str,
+        device_info: DeviceInfo,
+    ):
+        """Initialize the binary sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_unique_id = f"apsystemsapi_{device_name}_{description.key}"
+        self._attr_device_info = device_info
+
+    def _restore_state(self, last_state: State) -> None:
+        self._attr_is_on = last_state.state == STATE_ON
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self.coordinator.data is not None and (
+            alarms := self.coordinator.data.alarm_info
+        ) is not None:
+            self._attr_is_on = (
+                self.entity_description.value_fn(alarms) == Status.alarm
+            )
+        self._async_write_if_changed()
@@ -0,0 +1,142 @@
+"""Circuit breaker shared by everything talking to one inverter."""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from enum import StrEnum
+from time import monotonic
+from typing import TypeVar
+
+from aiohttp import client_exceptions
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT, DATA_BREAKERS
+
+_T = TypeVar("_T")
+
+
+class CircuitOpenError(Exception):
+    """The inverter is considered unreachable, the request was not sent."""
+
+
+class BreakerState(StrEnum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fail fast while an inverter is unreachable.
+
+    After a number of consecutive connection failures the breaker opens and
+    rejects every request without touching the network. Once the reset
+    timeout passed, a single request is let through as a probe: if it
+    succeeds the breaker closes again, otherwise it stays open for another
+    reset timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._listeners: list[CALLBACK_TYPE] = []
+        # Entries using the breaker, it is dropped once the last one is gone.
+        self.users = 0
+
+    @property
+    def available(self) -> bool:
+        """Return whether requests currently reach the inverter."""
+        return self.state is BreakerState.CLOSED
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call back when the availability changes and return a callback to stop."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    @callback
+    def _set_state(self, state: BreakerState) -> None:
+        was_available = self.available
+        self.state = state
+        if state is BreakerState.OPEN:
+            self._opened_at = monotonic()
+        if self.available != was_available:
+            for update_callback in list(self._listeners):
+                update_callback()
+
+    async def async_call(self, func: Callable[..., Awaitable[_T]], *args) -> _T:
+        """Send a request through the breaker."""
+        if self.state is BreakerState.OPEN:
+            if monotonic() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError
+            self._set_state(BreakerState.HALF_OPEN)
+        probe = self.state is BreakerState.HALF_OPEN
+        if probe:
+            if self._probing:
+                # Only the probe may wait for the inverter.
+                self.rejected += 1
+                raise CircuitOpenError
+            self._probing = True
+        try:
+            result = await func(*args)
+        except (TimeoutError, client_exceptions.ClientConnectionError):
+            self.failures += 1
+            if (
+                self.state is BreakerState.HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                self._set_state(BreakerState.OPEN)
+            raise
+        finally:
+            if probe:
+                self._probing = False
+        self.failures = 0
+        if self.state is not BreakerState.CLOSED:
+            self._set_state(BreakerState.CLOSED)
+        return result
+
+    def as_dict(self) -> dict[str, object]:
+        """Return the state for the diagnostics download."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+
+@callback
+def async_get_breaker(hass: HomeAssistant, ip_address: str) -> CircuitBreaker:
+    """Return the breaker of the inverter at the address, shared by all entries.
+
+    Every entry getting a breaker has to release it with async_release_breaker
+    when it unloads.
+    """
+    breakers: dict[str, CircuitBreaker] = hass.data.setdefault(DATA_BREAKERS, {})
+    if (breaker := breakers.get(ip_address)) is None:
+        breaker = breakers[ip_address] = CircuitBreaker()
+    breaker.users += 1
+    return breaker
+
+
+@callback
+def async_release_breaker(hass: HomeAssistant, ip_address: str) -> None:
+    """Release the breaker of an address and drop it once nothing uses it."""
+    breakers: dict[str, CircuitBreaker] = hass.data.get(DATA_BREAKERS, {})
+    if (breaker := breakers.get(ip_address)) is None:
+        return
+    breaker.users -= 1
+    if breaker.users <= 0:
+        del breakers[ip_address]
@@ -0,0 +1,128 @@
+"""Coalescing command queue for the settings of an inverter."""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+
+from .breaker import CircuitOpenError
+from .const import COMMAND_DEBOUNCE, LOGGER
+
+if TYPE_CHECKING:
+    from . import ApSystemsDataCoordinator
+
+# Commands are named after the field of ApSystemsSensorData they change.
+MAX_POWER = "max_power"
+POWER_STATUS = "power_status"
+
+# Streams the next regular poll fetches again after a command was sent, the
+# inverter raises or clears the off-grid and output alarms on/off as well.
+REFRESH_AFTER = {
+    MAX_POWER: (MAX_POWER,),
+    POWER_STATUS: (POWER_STATUS, "alarm_info"),
+}
+
+
+class ApSystemsCommandQueue:
+    """Send setting changes to an inverter one at a time.
+
+    Writes are debounced and coalesced, so only the latest value of each
+    setting is sent. The value returned by the inverter is stored in the
+    coordinator snapshot, which the next regular poll confirms, instead of
+    reading it back with an extra request.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: ApSystemsDataCoordinator
+    ) -> None:
+        """Initialize the queue."""
+        self.coordinator = coordinator
+        self._pending: dict[str, Any] = {}
+        self._debouncer = Debouncer(
+            hass,
+            LOGGER,
+            cooldown=COMMAND_DEBOUNCE,
+            immediate=False,
+            function=self._async_flush,
+        )
+
+    def is_pending(self, command: str) -> bool:
+        """Return whether a value for the command has not been sent yet."""
+        return command in self._pending
+
+    @callback
+    def async_queue(self, command: str, value: Any) -> None:
+        """Queue a value, replacing any value of the same command not sent yet."""
+        self._pending[command] = value
+        self._debouncer.async_schedule_call()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Drop all pending commands."""
+        self._debouncer.async_shutdown()
+        self._pending.clear()
+
+    async def _async_send(self, command: str, value: Any) -> Any:
+        api = self.coordinator.api
+        breaker = self.coordinator.breaker
+        if command == MAX_POWER:
+            return await breaker.async_call(api.set_max_power, value)
+        return await breaker.async_call(api.set_device_power_status, value)
+
+    async def async_send_now(self, command: str, value: Any) -> bool:
+        """Send a value right away and return whether the inverter took it.
+
+        Any value of the same command that was not sent yet is dropped.
+        """
+        self._pending.pop(command, None)
+        sent = await self._async_apply(command, value)
+        if sent:
+            self.coordinator.async_mark_due(REFRESH_AFTER[command])
+        self.coordinator.async_update_listeners()
+        return sent
+
+    async def _async_apply(self, command: str, value: Any) -> bool:
+        """Send a value and store the value returned by the inverter."""
+        try:
+            result = await self._async_send(command, value)
+        except CircuitOpenError:
+            LOGGER.debug(
+                "Not sending %s=%s to %s, it is unreachable",
+                command,
+                value,
+                self.coordinator.api.base_url,
+            )
+            return False
+        except Exception as err:  # pylint: disable=broad-except
+            # Besides connection errors the inverter may answer FAILED or
+            # garbage, a failed write must never leave the command pending.
+            LOGGER.warning(
+                "Sending %s=%s to %s failed: %r",
+                command,
+                value,
+                self.coordinator.api.base_url,
+                err,
+            )
+            return False
+        if self.coordinator.data is not None and result is not None:
+            self.coordinator.data = dataclasses.replace(
+                self.coordinator.data, **{command: result}
+            )
+        return True
+
+    async def _async_flush(self) -> None:
+        while self._pending:
+            command, value = next(iter(self._pending.items()))
+            try:
+                if await self._async_apply(command, value):
+                    self.coordinator.async_mark_due(REFRESH_AFTER[command])
+            finally:
+                # Keep the command if a newer value was queued while this one
+                # was sent.
+                if self._pending.get(command) == value:
+                    del self._pending[command]
+            # Entities drop their optimistic state if the command failed.
+            self.coordinator.async_update_listeners()
@@ -1,4 +1,5 @@
 import asyncio
+from ipaddress import IPv4Network
 from typing import Any
 
 from aiohttp import client_exceptions
@@ -6,35 +7,115 @@ from APsystemsEZ1 import APsystemsEZ1M
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.components import network
 from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, LOGGER, UPDATE_INTERVAL
+from . import entry_config
+from .const import (
+    ADAPTIVE_POLLING,
+    CONF_SUBNET,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_MAX_SILENCE,
+    DEFAULT_MAX_TIMEOUT,
+    DEFAULT_MIN_TIMEOUT,
+    DOMAIN,
+    EXPORT_TARGET,
+    FAST_TRANSPORT,
+    FLEET_MODE,
+    GRID_METER,
+    IMPORT_STATISTICS,
+    LOGGER,
+    MAX_DISCOVERY_HOSTS,
+    MAX_SILENCE,
+    MAX_TIMEOUT,
+    MIN_TIMEOUT,
+    PERSIST_HISTORY,
+    POWER_DEADBAND,
+    POWER_DEADBAND_PERCENT,
+    POWER_THRESHOLD,
+    SAMPLING_INTERVAL,
+    SITE,
+    UPDATE_INTERVAL,
+)
+from .discovery import async_scan_subnet
 
+# Only the basics, everything else is changed in the options.
 DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_IP_ADDRESS): str,
         vol.Required(CONF_NAME): str,
         vol.Optional("check", default=True): bool,
-        vol.Optional(UPDATE_INTERVAL, default=15): int
+        vol.Optional(UPDATE_INTERVAL, default=15): int,
     }
 )
 
+# Settings the options flow can change. Those in RELOAD_OPTIONS of __init__
+# reload the entry, the others are applied to the running entry in place.
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_IP_ADDRESS): str,
+        vol.Optional(UPDATE_INTERVAL, default=15): int,
+        vol.Optional(ADAPTIVE_POLLING, default=DEFAULT_ADAPTIVE_POLLING): bool,
+        vol.Optional(POWER_DEADBAND, default=0): int,
+        vol.Optional(POWER_DEADBAND_PERCENT, default=0): int,
+        vol.Optional(MAX_SILENCE, default=DEFAULT_MAX_SILENCE): int,
+        vol.Optional(POWER_THRESHOLD, default=0): int,
+        vol.Optional(MIN_TIMEOUT, default=DEFAULT_MIN_TIMEOUT): vol.Coerce(float),
+        vol.Optional(MAX_TIMEOUT, default=DEFAULT_MAX_TIMEOUT): vol.Coerce(float),
+        vol.Optional(FLEET_MODE, default=False): bool,
+        vol.Optional(SAMPLING_INTERVAL, default=0): int,
+        vol.Optional(PERSIST_HISTORY, default=False): bool,
+        vol.Optional(IMPORT_STATISTICS, default=False): bool,
+        vol.Optional(FAST_TRANSPORT, default=False): bool,
+        vol.Optional(GRID_METER, default=""): str,
+        vol.Optional(EXPORT_TARGET, default=0): int,
+    }
+)
+
+
 class APsystemsLocalAPIFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Config flow for Blueprint."""
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._discovered: dict[str, str] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+            config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Return the options flow of an entry."""
+        return APsystemsLocalAPIOptionsFlow(config_entry)
+
     async def async_step_user(
             self,
             user_input: dict | None = None,
     ) -> config_entries.FlowResult:
         """Handle a flow initialized by the user."""
+        return self.async_show_menu(
+            step_id="user", menu_options=["manual", "scan", "site"]
+        )
+
+    async def async_step_manual(
+            self,
+            user_input: dict | None = None,
+    ) -> config_entries.FlowResult:
+        """Add an inverter by its IP address."""
         _errors = {}
 
         if user_input is not None:
             try:
                 if user_input["check"]:
-                    api = APsystemsEZ1M(user_input[CONF_IP_ADDRESS])
+                    api = APsystemsEZ1M(
+                        user_input[CONF_IP_ADDRESS],
+                        session=async_get_clientsession(self.hass),
+                    )
                     await api.get_device_info()
             except (client_exceptions.ClientConnectionError, asyncio.TimeoutError) as exception:
                 LOGGER.warning(exception)
@@ -46,7 +127,164 @@ class APsystemsLocalAPIFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=DATA_SCHEMA,
             errors=_errors,
         )
+
+    async def async_step_scan(
+            self,
+            user_input: dict | None = None,
+    ) -> config_entries.FlowResult:
+        """Search a subnet for inverters."""
+        _errors = {}
+
+        if user_input is not None:
+            try:
+                subnet = IPv4Network(user_input[CONF_SUBNET], strict=False)
+            except ValueError:
+                _errors["base"] = "invalid_subnet"
+            else:
+                if subnet.num_addresses > MAX_DISCOVERY_HOSTS:
+                    _errors["base"] = "subnet_too_large"
+                else:
+                    configured = {
+                        entry_config(entry).get(CONF_IP_ADDRESS)
+                        for entry in self._async_current_entries()
+                    }
+                    configured_ids = self._async_current_ids()
+                    self._discovered = {
+                        info.ipAddr: f"{info.deviceId} ({info.ipAddr})"
+                        for info in await async_scan_subnet(self.hass, subnet)
+                        if info.ipAddr not in configured
+                        and info.deviceId not in configured_ids
+                    }
+                    if self._discovered:
+                        return await self.async_step_scan_results()
+                    _errors["base"] = "no_devices_found"
+
+        default_subnet = "192.168.1.0/24"
+        # The network integration is optional, without it offer the usual
+        # home subnet.
+        if "network" in self.hass.config.components:
+            try:
+                source_ip = await network.async_get_source_ip(self.hass)
+                default_subnet = str(IPv4Network(f"{source_ip}/24", strict=False))
+            except ValueError:
+                pass
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_SUBNET, default=default_subnet): str}
+            ),
+            errors=_errors,
+        )
+
+    async def async_step_site(
+            self,
+            user_input: dict | None = None,
+    ) -> config_entries.FlowResult:
+        """Add the device summing up all inverters."""
+        await self.async_set_unique_id(SITE)
+        self._abort_if_unique_id_configured(error="site_already_configured")
+        if user_input is not None:
+            return self.async_create_entry(title="APsystems Site", data={SITE: True})
+
+        return self.async_show_form(step_id="site")
+
+    async def async_step_scan_results(
+            self,
+            user_input: dict | None = None,
+    ) -> config_entries.FlowResult:
+        """Add the selected inverters found by the scan."""
+        if user_input is not None and user_input[CONF_IP_ADDRESS]:
+            first, *others = user_input[CONF_IP_ADDRESS]
+            # A flow creates a single entry, the others get a flow of their own.
+            for ip_address in others:
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_IMPORT},
+                        data=self._discovered_entry_data(ip_address),
+                    )
+                )
+            return await self.async_step_import(self._discovered_entry_data(first))
+
+        return self.async_show_form(
+            step_id="scan_results",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_IP_ADDRESS, default=list(self._discovered)
+                    ): cv.multi_select(self._discovered)
+                }
+            ),
+        )
+
+    def _discovered_entry_data(self, ip_address: str) -> dict[str, Any]:
+        device_id = self._discovered[ip_address].split(" ", 1)[0]
+        return DATA_SCHEMA(
+            {CONF_IP_ADDRESS: ip_address, CONF_NAME: device_id, "check": False}
+        )
+
+    async def async_step_import(
+            self,
+            import_data: dict[str, Any],
+    ) -> config_entries.FlowResult:
+        """Create an entry for a discovered inverter."""
+        await self.async_set_unique_id(import_data[CONF_NAME])
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=import_data[CONF_NAME],
+            data=import_data,
+        )
+
+
+class APsystemsLocalAPIOptionsFlow(config_entries.OptionsFlow):
+    """Change the settings of a configured inverter."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+            self,
+            user_input: dict | None = None,
+    ) -> config_entries.FlowResult:
+        """Show the current settings."""
+        _errors = {}
+
+        if user_input is not None:
+            if self._export_target_conflict(user_input):
+                _errors[EXPORT_TARGET] = "export_target_conflict"
+            else:
+                return self.async_create_entry(
+                    title="", data={**self.config_entry.options, **user_input}
+                )
+
+        # Entries created before an option existed use its default.
+        defaults = OPTIONS_SCHEMA({CONF_IP_ADDRESS: ""})
+        config = {**defaults, **entry_config(self.config_entry), **(user_input or {})}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(OPTIONS_SCHEMA, config),
+            errors=_errors,
+        )
+
+    def _export_target_conflict(self, user_input: dict[str, Any]) -> bool:
+        """Return whether another inverter behind the meter has another target.
+
+        All inverters behind a grid meter share one controller and so one
+        target.
+        """
+        if not (meter := user_input.get(GRID_METER)):
+            return False
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            config = entry_config(entry)
+            if (
+                entry.entry_id != self.config_entry.entry_id
+                and config.get(GRID_METER) == meter
+                and config.get(EXPORT_TARGET, 0) != user_input.get(EXPORT_TARGET, 0)
+            ):
+                return True
+        return False
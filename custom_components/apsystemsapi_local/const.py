@@ -3,3 +3,99 @@ from logging import Logger, getLogger
 LOGGER: Logger = getLogger(__package__)
 DOMAIN = "apsystemsapi_local"
 UPDATE_INTERVAL = "update_interval"
+ADAPTIVE_POLLING = "adaptive_polling"
+DEFAULT_ADAPTIVE_POLLING = True
+
+# Polling never runs faster than this (in seconds) while the sun is down.
+NIGHT_UPDATE_INTERVAL = 300
+# Upper bound (in seconds) for the backoff while the inverter is unreachable.
+MAX_BACKOFF_INTERVAL = 600
+
+POWER_DEADBAND = "power_deadband"
+POWER_DEADBAND_PERCENT = "power_deadband_percent"
+MAX_SILENCE = "max_silence"
+
+# Seconds after which a power sensor publishes even if the change is inside its deadband.
+DEFAULT_MAX_SILENCE = 300
+
+# The EZ1 web server only handles a few requests at a time, queue the rest.
+MAX_CONNECTIONS_PER_HOST = 2
+
+FAST_TRANSPORT = "fast_transport"
+
+FLEET_MODE = "fleet_mode"
+DATA_FLEET = f"{DOMAIN}_fleet"
+
+# Seconds between two scheduling rounds of the fleet.
+FLEET_TICK_INTERVAL = 1
+# Maximum number of inverters the fleet polls at the same time.
+FLEET_MAX_CONCURRENCY = 8
+
+# Seconds setting changes are collected before the latest value is sent.
+COMMAND_DEBOUNCE = 1.0
+
+SAMPLING_INTERVAL = "sampling_interval"
+POWER_THRESHOLD = "power_threshold"
+
+# Fired when the sampled total power crosses the configured threshold.
+EVENT_POWER_THRESHOLD = f"{DOMAIN}_power_threshold"
+
+MIN_TIMEOUT = "min_timeout"
+MAX_TIMEOUT = "max_timeout"
+
+# Bounds (in seconds) of the request timeout derived from the round-trip times.
+DEFAULT_MIN_TIMEOUT = 1.0
+DEFAULT_MAX_TIMEOUT = 8.0
+
+# Seconds between two polls of the max power and the on/off status.
+SETTINGS_UPDATE_INTERVAL = 60
+# Seconds between two polls of the alarm flags.
+ALARM_UPDATE_INTERVAL = 120
+# Seconds between two polls of the device info.
+DEVICE_INFO_UPDATE_INTERVAL = 3600
+
+PERSIST_HISTORY = "persist_history"
+
+# Number of output samples kept per inverter, e.g. about 17 hours of polls
+# every 15 seconds or an hour of samples every second.
+HISTORY_SIZE = 4096
+
+IMPORT_STATISTICS = "import_statistics"
+
+# Marks the config entry of the site aggregate device.
+SITE = "site"
+# Device identifier and unique ID prefix of the site, apart from any inverter name.
+SITE_ID = f"{DOMAIN}_site_aggregate"
+DATA_SITE = f"{DOMAIN}_site"
+
+GRID_METER = "grid_meter"
+EXPORT_TARGET = "export_target"
+DATA_EXPORT_CONTROLLERS = f"{DOMAIN}_export_controllers"
+
+# Watts the max power may differ from the computed one before it is written.
+ZERO_EXPORT_HYSTERESIS = 10
+# Watts the max power may rise with one write, lowering it is not limited.
+ZERO_EXPORT_MAX_RAMP_UP = 100
+# Minimum seconds between two max power writes to the same inverter.
+ZERO_EXPORT_MIN_WRITE_INTERVAL = 2.0
+
+DATA_PROFILING = f"{DOMAIN}_profiling"
+
+DATA_STARTUP_LIMIT = f"{DOMAIN}_startup_limit"
+# Maximum number of entries running their first poll at the same time.
+STARTUP_CONCURRENCY = 4
+
+CONF_SUBNET = "subnet"
+
+# Seconds a host gets to answer during a subnet scan.
+DISCOVERY_TIMEOUT = 1
+# Maximum number of hosts probed at the same time during a subnet scan.
+DISCOVERY_CONCURRENCY = 64
+# Largest subnet that can be scanned, a /22.
+MAX_DISCOVERY_HOSTS = 1024
+
+DATA_BREAKERS = f"{DOMAIN}_breakers"
+# Consecutive connection failures after which requests to an inverter fail fast.
+BREAKER_FAILURE_THRESHOLD = 3
+# Seconds until a single probe request may test whether the inverter is back.
+BREAKER_RESET_TIMEOUT = 30
@@ -0,0 +1,99 @@
+"""Statistics derived from the output samples in constant time per sample."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+
+# Windows (in seconds) of the rolling mean power.
+SHORT_WINDOW = 5 * 60
+LONG_WINDOW = 15 * 60
+
+
+@dataclass(frozen=True)
+class DerivedStatistics:
+    """Values of the derived statistics at the last sample."""
+
+    peak_power_today: float | None
+    mean_power_5min: float | None
+    mean_power_15min: float | None
+    # Percentage of the power of the last 15 minutes produced by each input.
+    p1_share: float | None
+    p2_share: float | None
+
+
+class PowerWindow:
+    """Running sums of the power of both inputs over a sliding time window.
+
+    Every sample is added and removed exactly once, so keeping the mean up
+    to date costs constant time per sample however long the window is.
+    """
+
+    def __init__(self, window: float) -> None:
+        """Initialize the window."""
+        self.window = window
+        self._samples: deque[tuple[float, float, float]] = deque()
+        self._sum_p1 = 0.0
+        self._sum_p2 = 0.0
+
+    def add(self, timestamp: float, p1: float, p2: float) -> None:
+        """Add a sample and drop the ones that fell out of the window."""
+        samples = self._samples
+        samples.append((timestamp, p1, p2))
+        self._sum_p1 += p1
+        self._sum_p2 += p2
+        oldest = timestamp - self.window
+        while samples[0][0] <= oldest:
+            _, old_p1, old_p2 = samples.popleft()
+            self._sum_p1 -= old_p1
+            self._sum_p2 -= old_p2
+
+    @property
+    def sums(self) -> tuple[float, float]:
+        """Return the summed power of both inputs."""
+        return self._sum_p1, self._sum_p2
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean total power of the samples in the window."""
+        if not self._samples:
+            return None
+        return (self._sum_p1 + self._sum_p2) / len(self._samples)
+
+
+class PowerStatistics:
+    """Peak power of the day, rolling mean power and the split of the inputs."""
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self.peak_power_today: float | None = None
+        self._short = PowerWindow(SHORT_WINDOW)
+        self._long = PowerWindow(LONG_WINDOW)
+
+    def add(self, timestamp: float, p1: float, p2: float) -> None:
+        """Add a sample taken at a monotonic timestamp."""
+        power = p1 + p2
+        if self.peak_power_today is None or power > self.peak_power_today:
+            self.peak_power_today = power
+        self._short.add(timestamp, p1, p2)
+        self._long.add(timestamp, p1, p2)
+
+    def reset_daily(self) -> None:
+        """Start a new day."""
+        self.peak_power_today = 0.0
+
+    def snapshot(self) -> DerivedStatistics:
+        """Return the current values."""
+        sum_p1, sum_p2 = self._long.sums
+        total = sum_p1 + sum_p2
+        return DerivedStatistics(
+            peak_power_today=self.peak_power_today,
+            mean_power_5min=_round(self._short.mean),
+            mean_power_15min=_round(self._long.mean),
+            p1_share=_round(sum_p1 * 100 / total) if total > 0 else None,
+            p2_share=_round(sum_p2 * 100 / total) if total > 0 else None,
+        )
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 1)
@@ -0,0 +1,47 @@
+"""Diagnostics support for the APsystems local API integration."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_IP_ADDRESS
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_SITE, DOMAIN, SITE
+
+TO_REDACT = {CONF_IP_ADDRESS, "ipAddr", "ssid"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    if entry.data.get(SITE, False):
+        return {"site": hass.data[DATA_SITE].as_dict()}
+    coordinator = hass.data[DOMAIN][entry.entry_id]["COORDINATOR"]
+    return {
+        "entry": async_redact_data(entry.data, TO_REDACT),
+        "options": async_redact_data(entry.options, TO_REDACT),
+        "update_interval": coordinator.update_interval.total_seconds(),
+        "last_update_success": coordinator.last_update_success,
+        "consecutive_failures": coordinator.consecutive_failures,
+        "request_timeout": coordinator.request_timeout.value,
+        "metrics": coordinator.metrics.as_dict(),
+        "circuit_breaker": coordinator.breaker.as_dict(),
+        "site": (
+            coordinator.site.as_dict() if coordinator.site is not None else None
+        ),
+        "zero_export": (
+            coordinator.export_controller.as_dict()
+            if coordinator.export_controller is not None
+            else None
+        ),
+        "data": (
+            async_redact_data(asdict(coordinator.data), TO_REDACT)
+            if coordinator.data is not None
+            else None
+        ),
+    }
@@ -0,0 +1,48 @@
+"""Find EZ1 inverters in a subnet."""
+
+from __future__ import annotations
+
+import asyncio
+from ipaddress import IPv4Network
+
+from aiohttp import client_exceptions
+from aiohttp.http_exceptions import HttpBadRequest
+from APsystemsEZ1 import APsystemsEZ1M, InverterReturnedError, ReturnDeviceInfo
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DISCOVERY_CONCURRENCY, DISCOVERY_TIMEOUT
+
+
+async def async_scan_subnet(
+    hass: HomeAssistant, network: IPv4Network
+) -> list[ReturnDeviceInfo]:
+    """Probe every host of the network for the EZ1 local API concurrently."""
+    session = async_get_clientsession(hass)
+    limit = asyncio.Semaphore(DISCOVERY_CONCURRENCY)
+
+    async def probe(host: str) -> ReturnDeviceInfo | None:
+        api = APsystemsEZ1M(host, timeout=DISCOVERY_TIMEOUT, session=session)
+        async with limit:
+            try:
+                info = await api.get_device_info()
+            except (
+                TimeoutError,
+                client_exceptions.ClientError,
+                HttpBadRequest,
+                InverterReturnedError,
+                KeyError,
+                TypeError,
+                ValueError,
+            ):
+                # Nothing listening, or something that is not an EZ1.
+                return None
+        if info is None or not info.deviceId:
+            return None
+        # Report the address we reached it at, not the one it thinks it has.
+        info.ipAddr = host
+        return info
+
+    results = await asyncio.gather(*(probe(str(host)) for host in network.hosts()))
+    return [info for info in results if info is not None]
@@ -0,0 +1,55 @@
+"""High resolution energy counters integrated from the sampled power."""
+
+from __future__ import annotations
+
+# Do not integrate across gaps longer than this (in seconds), e.g. while the
+# inverter was unreachable, since the power in between is unknown.
+MAX_INTEGRATION_GAP = 300
+
+# A fine counter may restart up to one device step (in kWh) below its last
+# published value, e.g. after a restart, while a larger drop is a reset.
+MAX_RESTART_DROP = 1.0
+
+
+class EnergyIntegrator:
+    """Fill in the energy of one input between two steps of its device counter.
+
+    The power samples are integrated with the trapezoidal rule. Whenever the
+    coarse device counter advances, the accumulator is re-anchored to it so
+    the estimate can not drift away from the device.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the integrator."""
+        self.value: float | None = None
+        self._anchor: float | None = None
+        self._integrated = 0.0
+        self._last_sample: tuple[float, float] | None = None
+
+    def add_sample(self, timestamp: float, power: float) -> None:
+        """Add a power sample in W taken at a monotonic timestamp in seconds."""
+        if self._last_sample is not None:
+            last_timestamp, last_power = self._last_sample
+            elapsed = timestamp - last_timestamp
+            if 0 < elapsed <= MAX_INTEGRATION_GAP:
+                # W * s -> kWh
+                self._integrated += (last_power + power) / 2 * elapsed / 3_600_000
+        self._last_sample = (timestamp, power)
+
+    def update(self, counter: float) -> float:
+        """Re-anchor to the device counter in kWh and return the fine counter."""
+        if self._anchor is None or counter < self._anchor:
+            # First value or the device counter was reset.
+            self.value = None
+            self._anchor = counter
+            self._integrated = 0.0
+        elif counter > self._anchor:
+            self._anchor = counter
+            self._integrated = 0.0
+        value = self._anchor + self._integrated
+        # The estimate may have run ahead of the device, hold it until the
+        # device catches up instead of publishing a decrease.
+        if self.value is not None and value < self.value:
+            value = self.value
+        self.value = round(value, 4)
+        return self.value
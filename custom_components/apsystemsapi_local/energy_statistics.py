@@ -0,0 +1,135 @@
+"""Hourly long-term energy statistics imported straight into the recorder."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from APsystemsEZ1 import ReturnOutputData
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, LOGGER
+
+HOUR = timedelta(hours=1)
+
+# Suffix of the statistic id and name of every imported series.
+SERIES = {
+    "lifetime_production": "Lifetime Production",
+    "lifetime_production_p1": "Lifetime Production P1",
+    "lifetime_production_p2": "Lifetime Production P2",
+}
+
+
+@dataclass
+class _LastRow:
+    """The newest hour of a series in the recorder."""
+
+    start: datetime
+    state: float
+    sum: float
+
+
+class EnergyStatisticsImporter:
+    """Sum the lifetime counters of an inverter into hourly statistics.
+
+    The counters of the current hour are only kept in memory. When the first
+    poll of a later hour comes in, a row is written for every hour that
+    passed since the newest row in the recorder, in one job per series.
+    Hours without a poll, e.g. while Home Assistant was down, share the
+    energy the counters gained in the meantime evenly.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str) -> None:
+        """Initialize the importer."""
+        self.hass = hass
+        self.name = name
+        self.statistic_ids = {
+            series: f"{DOMAIN}:{slugify(name)}_{series}" for series in SERIES
+        }
+        self._last: dict[str, _LastRow] = {}
+
+    async def async_load(self) -> None:
+        """Read the newest imported hour of every series."""
+        recorder = get_instance(self.hass)
+        for series, statistic_id in self.statistic_ids.items():
+            last = await recorder.async_add_executor_job(
+                get_last_statistics,
+                self.hass,
+                1,
+                statistic_id,
+                False,
+                {"state", "sum"},
+            )
+            if rows := last.get(statistic_id):
+                row = rows[0]
+                self._last[series] = _LastRow(
+                    dt_util.utc_from_timestamp(row["start"]),
+                    row["state"] or 0.0,
+                    row["sum"] or 0.0,
+                )
+
+    @callback
+    def async_add(self, output_data: ReturnOutputData) -> None:
+        """Add the lifetime counters of a poll."""
+        hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        counters = {
+            "lifetime_production": output_data.te1 + output_data.te2,
+            "lifetime_production_p1": output_data.te1,
+            "lifetime_production_p2": output_data.te2,
+        }
+        for series, counter in counters.items():
+            if (statistics := self._rows(series, hour, counter)) is not None:
+                async_add_external_statistics(
+                    self.hass, self._metadata(series), statistics
+                )
+
+    def _rows(
+        self, series: str, hour: datetime, counter: float
+    ) -> list[StatisticData] | None:
+        """Return the rows of the hours that ended since the newest one."""
+        last = self._last.get(series)
+        if last is None:
+            # Nothing imported yet, start counting from this poll.
+            self._last[series] = _LastRow(hour - HOUR, counter, 0.0)
+            return None
+        hours = int((hour - last.start) / HOUR) - 1
+        if hours < 1:
+            return None
+        # A counter that went back was reset, e.g. by a new inverter.
+        base = last.state if counter >= last.state else 0.0
+        step = (counter - base) / hours
+        statistics = [
+            StatisticData(
+                start=last.start + HOUR * (index + 1),
+                state=base + step * (index + 1),
+                sum=last.sum + step * (index + 1),
+            )
+            for index in range(hours)
+        ]
+        if hours > 1:
+            LOGGER.debug(
+                "Backfilling %d hours of %s", hours, self.statistic_ids[series]
+            )
+        self._last[series] = _LastRow(
+            statistics[-1]["start"], counter, statistics[-1]["sum"]
+        )
+        return statistics
+
+    def _metadata(self, series: str) -> StatisticMetaData:
+        return StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{self.name} {SERIES[series]}",
+            source=DOMAIN,
+            statistic_id=self.statistic_ids[series],
+            unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
@@ -0,0 +1,119 @@
+"""Base entity of the APsystems local API integration."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from time import monotonic
+from typing import Any
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, State, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import ApSystemsDataCoordinator
+from .const import DOMAIN
+
+
+def inverter_device_info(device_name: str) -> DeviceInfo:
+    """Return the device all entities of an inverter belong to."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, device_name)},
+        name=device_name,
+        manufacturer="APsystems",
+        model="EZ1-M",
+    )
+
+
+class ApSystemsRestoreEntity(
+    CoordinatorEntity[ApSystemsDataCoordinator], RestoreEntity
+):
+    """Coordinator entity showing its last known state until the first poll.
+
+    The first poll runs in the background after startup, so without this
+    every entity would be unknown until the inverter answered.
+
+    The state is only written when it or the availability changed. A change
+    held back by a deadband is written once the configured maximum silence
+    is over, even if no further update comes in.
+    """
+
+    _restored_available = True
+    _published_state: Any = None
+    _published_available: bool | None = None
+    _published_at = 0.0
+    _unsub_silence: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last known state and availability."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_silence)
+        if self.coordinator.data is not None:
+            self._handle_coordinator_update()
+            return
+        last_state = await self.async_get_last_state()
+        if last_state is None or last_state.state == STATE_UNKNOWN:
+            return
+        self._restored_available = last_state.state != STATE_UNAVAILABLE
+        if self._restored_available:
+            self._restore_state(last_state)
+
+    def _restore_state(self, last_state: State) -> None:
+        """Apply the restored state to the entity."""
+        raise NotImplementedError("Must be implemented by subclasses.")
+
+    def _publish_value(self) -> Any:
+        """Return the value compared against the last written one."""
+        return self.state
+
+    def _state_changed(self, old: Any, new: Any) -> bool:
+        """Return whether the new state is worth publishing."""
+        return old != new
+
+    @callback
+    def _async_write_if_changed(self) -> None:
+        """Write the state if it or the availability changed since the last write."""
+        now = monotonic()
+        available = self.available
+        value = self._publish_value()
+        silence = self.coordinator.max_silence
+        if (
+            available == self._published_available
+            and now - self._published_at < silence
+        ):
+            if not self._state_changed(self._published_state, value):
+                if value != self._published_state and self._unsub_silence is None:
+                    # Steady data does not update the entity again.
+                    self._unsub_silence = async_call_later(
+                        self.hass,
+                        self._published_at + silence - now,
+                        self._async_silence_over,
+                    )
+                return
+        self._async_cancel_silence()
+        self._published_state = value
+        self._published_available = available
+        self._published_at = now
+        self.async_write_ha_state()
+
+    @callback
+    def _async_silence_over(self, _now: datetime) -> None:
+        self._unsub_silence = None
+        self._async_write_if_changed()
+
+    @callback
+    def _async_cancel_silence(self) -> None:
+        if self._unsub_silence is not None:
+            self._unsub_silence()
+            self._unsub_silence = None
+
+    @property
+    def available(self) -> bool:
+        if not self.coordinator.breaker.available:
+            return False
+        if self.coordinator.data is None and self.coordinator.last_update_success:
+            # Not polled yet, keep the availability from before the restart.
+            return self._restored_available
+        return super().available
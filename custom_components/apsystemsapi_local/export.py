@@ -0,0 +1,256 @@
+"""Zero-export control of the max power of inverters behind a grid meter."""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, UnitOfPower
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+)
+from homeassistant.util import dt as dt_util
+
+from .commands import MAX_POWER
+from .const import (
+    DATA_EXPORT_CONTROLLERS,
+    LOGGER,
+    ZERO_EXPORT_HYSTERESIS,
+    ZERO_EXPORT_MAX_RAMP_UP,
+    ZERO_EXPORT_MIN_WRITE_INTERVAL,
+)
+from .metrics import percentile
+
+if TYPE_CHECKING:
+    from . import ApSystemsDataCoordinator
+
+# Limits of the EZ1-M, used until the inverter reported its own.
+DEFAULT_MIN_POWER = 30
+DEFAULT_MAX_POWER = 800
+# Number of recent control latencies the percentiles are computed from.
+RECENT_LATENCIES = 100
+
+
+class ZeroExportController:
+    """Keep the grid power of a meter at a target by limiting the inverters.
+
+    The grid meter reports the power drawn from the grid as positive and the
+    exported power as negative. Every meter update computes how much the
+    inverters behind the meter may produce and splits that between them.
+
+    A limit is only written when it differs from the current one by more
+    than the hysteresis, at most once per write interval per inverter, and
+    may rise by a bounded step per write. Lowering it is never rate limited
+    so export is stopped as fast as the inverter allows.
+    """
+
+    def __init__(self, hass: HomeAssistant, meter: str, target: float) -> None:
+        """Initialize the controller."""
+        self.hass = hass
+        self.meter = meter
+        self.target = target
+        self.coordinators: list[ApSystemsDataCoordinator] = []
+        self.writes = 0
+        self.skipped = 0
+        self.last_latency: float | None = None
+        self.recent_latencies: deque[float] = deque(maxlen=RECENT_LATENCIES)
+        # Limit last written to each inverter and when.
+        self._limits: dict[ApSystemsDataCoordinator, int] = {}
+        self._written_at: dict[ApSystemsDataCoordinator, float] = {}
+        self._confirmed_at: dict[ApSystemsDataCoordinator, datetime] = {}
+        self._in_flight: set[ApSystemsDataCoordinator] = set()
+        self._unsub_meter: CALLBACK_TYPE | None = None
+        self._unsub_retry: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_register(self, coordinator: ApSystemsDataCoordinator) -> CALLBACK_TYPE:
+        """Add an inverter behind the meter and return a callback to remove it."""
+        self.coordinators.append(coordinator)
+        coordinator.export_controller = self
+        if self._unsub_meter is None:
+            self._unsub_meter = async_track_state_change_event(
+                self.hass, self.meter, self._async_meter_changed
+            )
+
+        @callback
+        def unregister() -> None:
+            coordinator.export_controller = None
+            self.coordinators.remove(coordinator)
+            self._limits.pop(coordinator, None)
+            self._written_at.pop(coordinator, None)
+            self._confirmed_at.pop(coordinator, None)
+            if not self.coordinators:
+                self._async_stop()
+
+        return unregister
+
+    @callback
+    def _async_stop(self) -> None:
+        if self._unsub_meter is not None:
+            self._unsub_meter()
+            self._unsub_meter = None
+        if self._unsub_retry is not None:
+            self._unsub_retry()
+            self._unsub_retry = None
+        self.hass.data.get(DATA_EXPORT_CONTROLLERS, {}).pop(self.meter, None)
+
+    @callback
+    def _async_meter_changed(self, event: Event) -> None:
+        if (state := event.data["new_state"]) is not None:
+            self._async_control(state)
+
+    @callback
+    def _async_retry(self, _now: Any) -> None:
+        self._unsub_retry = None
+        if (state := self.hass.states.get(self.meter)) is not None:
+            self._async_control(state)
+
+    @staticmethod
+    def _grid_power(state: State) -> float | None:
+        """Return the grid power of a meter state in W."""
+        if state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return None
+        try:
+            power = float(state.state)
+        except ValueError:
+            return None
+        if state.attributes.get("unit_of_measurement") == UnitOfPower.KILO_WATT:
+            power *= 1000
+        return power
+
+    @staticmethod
+    def _bounds(coordinator: ApSystemsDataCoordinator) -> tuple[int, int]:
+        data = coordinator.data
+        if data is not None and data.device_info is not None:
+            return data.device_info.minPower, data.device_info.maxPower
+        return DEFAULT_MIN_POWER, DEFAULT_MAX_POWER
+
+    def _output(self, coordinator: ApSystemsDataCoordinator) -> float:
+        """Estimate the current output of an inverter in W."""
+        data = coordinator.output_data
+        output = 0.0 if data is None else data.p1 + data.p2
+        if (limit := self._limits.get(coordinator)) is not None:
+            # The polled output may predate the last limit.
+            output = min(output, limit)
+        return output
+
+    @callback
+    def _async_control(self, state: State) -> None:
+        if (grid_power := self._grid_power(state)) is None:
+            return
+        inverters = [
+            coordinator
+            for coordinator in self.coordinators
+            if coordinator.data is not None and coordinator.breaker.available
+        ]
+        if not inverters:
+            return
+        # Share of the power each inverter has to add to draw exactly the target.
+        headroom = (grid_power - self.target) / len(inverters)
+
+        now = monotonic()
+        retry_in: float | None = None
+        for coordinator in inverters:
+            confirmed_at = self._confirmed_at.get(coordinator)
+            if coordinator in self._in_flight or (
+                confirmed_at is not None and state.last_updated < confirmed_at
+            ):
+                # The meter can not have seen the last limit yet.
+                continue
+            min_power, max_power = self._bounds(coordinator)
+            current = self._limits.get(coordinator, coordinator.data.max_power)
+            limit = self._output(coordinator) + headroom
+            if current is not None:
+                limit = min(limit, current + ZERO_EXPORT_MAX_RAMP_UP)
+            limit = int(min(max_power, max(min_power, limit)))
+            if current is not None and abs(limit - current) <= ZERO_EXPORT_HYSTERESIS:
+                continue
+            written_at = self._written_at.get(coordinator, 0.0)
+            wait = written_at + ZERO_EXPORT_MIN_WRITE_INTERVAL - now
+            if wait > 0:
+                self.skipped += 1
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+                continue
+            self._in_flight.add(coordinator)
+            self._written_at[coordinator] = now
+            self.hass.async_create_task(
+                self._async_write(coordinator, limit, state),
+                f"APsystems zero export {coordinator.api.base_url}",
+            )
+        if retry_in is not None and self._unsub_retry is None:
+            # Apply the latest meter state as soon as writing is allowed again.
+            self._unsub_retry = async_call_later(
+                self.hass, retry_in, self._async_retry
+            )
+
+    async def _async_write(
+        self, coordinator: ApSystemsDataCoordinator, limit: int, state: State
+    ) -> None:
+        try:
+            sent = await coordinator.commands.async_send_now(MAX_POWER, limit)
+        finally:
+            self._in_flight.discard(coordinator)
+        if not sent:
+            return
+        now = dt_util.utcnow()
+        self._limits[coordinator] = limit
+        self._confirmed_at[coordinator] = now
+        self.writes += 1
+        # From the meter reporting the grid power to the inverter taking the limit.
+        latency = (now - state.last_updated).total_seconds()
+        self.last_latency = latency
+        self.recent_latencies.append(latency)
+        LOGGER.debug(
+            "Limited %s to %d W for %s W grid power in %.3f seconds",
+            coordinator.api.base_url,
+            limit,
+            state.state,
+            latency,
+        )
+
+    def latency_percentile(self, percent: float) -> float | None:
+        """Return a percentile (in seconds) of the recent control latencies."""
+        return percentile(self.recent_latencies, percent)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state for the diagnostics download."""
+        return {
+            "meter": self.meter,
+            "target": self.target,
+            "inverters": len(self.coordinators),
+            "writes": self.writes,
+            "skipped": self.skipped,
+            "last_latency": self.last_latency,
+            "latency_p50": self.latency_percentile(50),
+            "latency_p95": self.latency_percentile(95),
+        }
+
+
+@callback
+def async_get_export_controller(
+    hass: HomeAssistant, meter: str, target: float
+) -> ZeroExportController:
+    """Return the controller of a grid meter, shared by all inverters behind it.
+
+    The target is a setting of the meter. The options flow keeps the entries
+    behind a meter on the same target, entries that still disagree get the
+    target of the first one.
+    """
+    controllers: dict[str, ZeroExportController] = hass.data.setdefault(
+        DATA_EXPORT_CONTROLLERS, {}
+    )
+    if (controller := controllers.get(meter)) is None:
+        controller = controllers[meter] = ZeroExportController(hass, meter, target)
+    elif controller.target != target:
+        LOGGER.warning(
+            "The inverters behind %s keep the grid power at %s W, ignoring the"
+            " export target of %s W",
+            meter,
+            controller.target,
+            target,
+        )
+    return controller
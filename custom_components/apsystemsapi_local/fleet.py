@@ -0,0 +1,112 @@
+"""Shared polling engine for many APsystems inverters."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import random
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import FLEET_MAX_CONCURRENCY, FLEET_TICK_INTERVAL, LOGGER
+
+if TYPE_CHECKING:
+    from . import ApSystemsDataCoordinator
+
+
+class ApSystemsFleet:
+    """Poll the coordinators of all fleet mode entries from one scheduler.
+
+    Every coordinator gets a random phase offset within its interval so the
+    polls are spread evenly instead of firing on the same boundary. On each
+    tick all due inverters are fetched together, bounded by a global
+    concurrency limit. The listeners of each inverter are updated as soon as
+    its own fetch finished, so a slow inverter holds back nobody else.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the fleet."""
+        self.hass = hass
+        self._next_poll: dict[ApSystemsDataCoordinator, float] = {}
+        self._in_flight: set[ApSystemsDataCoordinator] = set()
+        self._semaphore = asyncio.Semaphore(FLEET_MAX_CONCURRENCY)
+        self._unsub_tick: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_register(
+        self, coordinator: ApSystemsDataCoordinator
+    ) -> CALLBACK_TYPE:
+        """Add a coordinator to the fleet and return a callback to remove it."""
+        coordinator.fleet = self
+        interval = coordinator.update_interval.total_seconds()
+        self._next_poll[coordinator] = self.hass.loop.time() + random.uniform(
+            0, interval
+        )
+        if self._unsub_tick is None:
+            self._unsub_tick = async_track_time_interval(
+                self.hass,
+                self._async_tick,
+                timedelta(seconds=FLEET_TICK_INTERVAL),
+                name="APsystems fleet",
+            )
+
+        @callback
+        def unregister() -> None:
+            coordinator.fleet = None
+            self._next_poll.pop(coordinator, None)
+            if not self._next_poll and self._unsub_tick is not None:
+                self._unsub_tick()
+                self._unsub_tick = None
+
+        return unregister
+
+    @callback
+    def async_reschedule(self, coordinator: ApSystemsDataCoordinator) -> None:
+        """Bring the next poll forward after the interval of a coordinator shrank."""
+        if (next_poll := self._next_poll.get(coordinator)) is not None:
+            interval = coordinator.update_interval.total_seconds()
+            self._next_poll[coordinator] = min(
+                next_poll, self.hass.loop.time() + interval
+            )
+
+    async def async_poll(self, coordinator: ApSystemsDataCoordinator) -> None:
+        """Poll a coordinator outside its schedule unless it is polled already."""
+        if coordinator not in self._in_flight:
+            await self._async_fetch(coordinator)
+
+    async def _async_fetch(self, coordinator: ApSystemsDataCoordinator) -> None:
+        self._in_flight.add(coordinator)
+        try:
+            async with self._semaphore:
+                update_listeners = await coordinator.async_fetch()
+        finally:
+            self._in_flight.discard(coordinator)
+        if update_listeners and coordinator in self._next_poll:
+            coordinator.async_update_listeners()
+
+    async def _async_tick(self, _now: datetime) -> None:
+        if self.hass.is_stopping:
+            return
+        now = self.hass.loop.time()
+        due: list[ApSystemsDataCoordinator] = []
+        for coordinator, next_poll in self._next_poll.items():
+            if next_poll > now or not coordinator.has_listeners:
+                continue
+            interval = coordinator.update_interval.total_seconds()
+            # Keep the phase of the inverter, skipping the slots it missed.
+            missed = int((now - next_poll) // interval)
+            self._next_poll[coordinator] = next_poll + (missed + 1) * interval
+            if coordinator in self._in_flight:
+                # The previous poll overran this slot, do not queue another.
+                coordinator.metrics.record_overrun(missed + 1)
+                continue
+            if missed:
+                coordinator.metrics.record_overrun(missed)
+            due.append(coordinator)
+        if not due:
+            return
+
+        await asyncio.gather(*(self._async_fetch(coordinator) for coordinator in due))
+        LOGGER.debug("Fleet polled %d of %d inverters", len(due), len(self._next_poll))
@@ -0,0 +1,137 @@
+"""Fixed-size history of the recent output samples of an inverter."""
+
+from __future__ import annotations
+
+from array import array
+import mmap
+import os
+
+# Columns of the history, each one a typed array of doubles.
+FIELDS = ("timestamp", "p1", "p2", "e1", "e2")
+# Layout version, capacity, index of the next sample and number of samples.
+HEADER_SIZE = 4
+LAYOUT_VERSION = 1
+
+
+class SampleHistory:
+    """Ring buffer of output samples stored column-wise in typed arrays.
+
+    With a path the buffer lives in a memory-mapped file, so the samples
+    survive a restart without any extra writes: the operating system writes
+    the pages back on its own.
+
+    The samples are kept in the order of their wall clock timestamps, which
+    survive a restart unlike a monotonic clock. A sample not newer than the
+    last one, e.g. after the clock was set back, is dropped so the
+    timestamps stay sorted for the bisection.
+    """
+
+    def __init__(self, capacity: int, path: str | None = None) -> None:
+        """Initialize an in-memory history, see open for the file."""
+        self.capacity = capacity
+        self.path = path
+        self._mmap: mmap.mmap | None = None
+        self._view: memoryview | None = None
+        self._header = array("d", [LAYOUT_VERSION, capacity, 0, 0])
+        self._columns = [array("d", bytes(8 * capacity)) for _ in FIELDS]
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return int(self._header[3])
+
+    def open(self) -> None:
+        """Map the history file, continuing with the samples stored in it.
+
+        This does blocking I/O, run it in the executor.
+        """
+        size = 8 * (HEADER_SIZE + len(FIELDS) * self.capacity)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fresh = os.fstat(fd).st_size != size
+            if fresh:
+                os.ftruncate(fd, size)
+            self._mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        view = self._view = memoryview(self._mmap).cast("d")
+        header = view[:HEADER_SIZE]
+        if fresh or header[0] != LAYOUT_VERSION or header[1] != self.capacity:
+            header[:] = array("d", [LAYOUT_VERSION, self.capacity, 0, 0])
+        self._header = header
+        self._columns = [
+            view[start : start + self.capacity]
+            for start in range(
+                HEADER_SIZE, HEADER_SIZE + len(FIELDS) * self.capacity, self.capacity
+            )
+        ]
+
+    def detach(self) -> mmap.mmap | None:
+        """Move the samples to memory and return the map to close, if any.
+
+        Run this in the event loop, so no sample is read or written while the
+        map is closed with close_map in the executor.
+        """
+        if self._mmap is None:
+            return None
+        header = array("d", self._header.tobytes())
+        columns = [array("d", column.tobytes()) for column in self._columns]
+        # The views have to be released before the map can be closed.
+        for column in self._columns:
+            column.release()
+        self._header.release()
+        self._view.release()
+        mapped = self._mmap
+        self._mmap = self._view = None
+        self._header = header
+        self._columns = columns
+        return mapped
+
+    def append(
+        self, timestamp: float, p1: float, p2: float, e1: float, e2: float
+    ) -> None:
+        """Store a sample, overwriting the oldest one when the buffer is full."""
+        header = self._header
+        index = int(header[2])
+        if header[3] and timestamp <= self._columns[0][index - 1]:
+            return
+        for column, value in zip(self._columns, (timestamp, p1, p2, e1, e2)):
+            column[index] = value
+        header[2] = (index + 1) % self.capacity
+        header[3] = min(header[3] + 1, self.capacity)
+
+    def _position(self, index: int) -> int:
+        """Return the array position of the index-th oldest sample."""
+        return (int(self._header[2]) - len(self) + index) % self.capacity
+
+    def _bisect(self, timestamp: float) -> int:
+        """Return the index of the oldest sample taken at or after the timestamp."""
+        timestamps = self._columns[0]
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[self._position(middle)] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def window(self, start: float, end: float) -> list[tuple[float, ...]]:
+        """Return the samples taken between two timestamps, oldest first."""
+        columns = self._columns
+        samples = []
+        for index in range(self._bisect(start), len(self)):
+            position = self._position(index)
+            if columns[0][position] > end:
+                break
+            samples.append(tuple(column[position] for column in columns))
+        return samples
+
+
+def close_map(mapped: mmap.mmap) -> None:
+    """Write a map returned by SampleHistory.detach back and close it.
+
+    This does blocking I/O, run it in the executor.
+    """
+    mapped.flush()
+    mapped.close()
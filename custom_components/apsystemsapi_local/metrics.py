@@ -0,0 +1,96 @@
+"""Rolling performance metrics of an inverter coordinator."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+# Upper bounds (in seconds) of the poll latency histogram buckets.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8)
+# Number of recent polls the latency percentiles are computed from.
+RECENT_POLLS = 100
+
+
+def percentile(values: Iterable[float], percent: float) -> float | None:
+    """Return a percentile of some values, None without any."""
+    if not (ordered := sorted(values)):
+        return None
+    return ordered[min(len(ordered) - 1, int(percent / 100 * len(ordered)))]
+
+
+class PollMetrics:
+    """Counters, latency histogram and timings of the polls of one inverter."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.successes = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.rejected = 0
+        self.overruns = 0
+        self.last_success: datetime | None = None
+        self.last_latency: float | None = None
+        self.last_dispatch_time: float | None = None
+        # One bucket per bound plus one for everything above the last bound.
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.recent_latencies: deque[float] = deque(maxlen=RECENT_POLLS)
+
+    def _record_latency(self, latency: float) -> None:
+        self.last_latency = latency
+        self.recent_latencies.append(latency)
+        self.latency_histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful poll."""
+        self.successes += 1
+        self.last_success = dt_util.utcnow()
+        self._record_latency(latency)
+
+    def record_timeout(self, latency: float) -> None:
+        """Record a poll that ran into the request timeout."""
+        self.timeouts += 1
+        self._record_latency(latency)
+
+    def record_error(self, latency: float) -> None:
+        """Record a poll that failed for any other reason."""
+        self.errors += 1
+        self._record_latency(latency)
+
+    def record_rejected(self) -> None:
+        """Record a poll the circuit breaker did not let through."""
+        self.rejected += 1
+
+    def record_overrun(self, slots: int) -> None:
+        """Record poll slots skipped because the previous poll still ran."""
+        self.overruns += slots
+
+    def record_dispatch(self, duration: float) -> None:
+        """Record how long updating the listeners took."""
+        self.last_dispatch_time = duration
+
+    def latency_percentile(self, percent: float) -> float | None:
+        """Return a percentile (in seconds) of the recent poll latencies."""
+        return percentile(self.recent_latencies, percent)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for the diagnostics download."""
+        bounds = [f"<={bound}s" for bound in LATENCY_BUCKETS]
+        bounds.append(f">{LATENCY_BUCKETS[-1]}s")
+        return {
+            "successes": self.successes,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "overruns": self.overruns,
+            "last_success": self.last_success,
+            "last_latency": self.last_latency,
+            "latency_p50": self.latency_percentile(50),
+            "latency_p95": self.latency_percentile(95),
+            "latency_histogram": dict(zip(bounds, self.latency_histogram)),
+            "last_dispatch_time": self.last_dispatch_time,
+        }
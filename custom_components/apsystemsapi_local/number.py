@@ -1,9 +1,5 @@
 from __future__ import annotations
 
-import asyncio
-
-from aiohttp import client_exceptions
-from APsystemsEZ1 import APsystemsEZ1M
 import voluptuous as vol
 
 from homeassistant import config_entries
@@ -13,13 +9,15 @@ from homeassistant.components.number import (
     NumberEntity,
 )
 from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, State, callback
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import DiscoveryInfoType
 
+from . import ApSystemsDataCoordinator
+from .commands import MAX_POWER
 from .const import DOMAIN
+from .entity import ApSystemsRestoreEntity, inverter_device_info
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Required(CONF_IP_ADDRESS): cv.string,
@@ -35,66 +33,45 @@ async def async_setup_entry(
 ) -> None:
     """Set up the sensor platform."""
     config = hass.data[DOMAIN][config_entry.entry_id]
-    api = APsystemsEZ1M(ip_address=config[CONF_IP_ADDRESS])
+    coordinator = config["COORDINATOR"]
 
     numbers = [
-        MaxPower(api, device_name=config[CONF_NAME], sensor_name="Max Output Power", sensor_id="max_output_power")
+        MaxPower(coordinator, device_name=config[CONF_NAME], sensor_name="Max Output Power", sensor_id="max_output_power")
     ]
 
-    add_entities(numbers, True)
+    add_entities(numbers)
 
 
-class MaxPower(NumberEntity):
+class MaxPower(ApSystemsRestoreEntity, NumberEntity):
     _attr_device_class = NumberDeviceClass.POWER
-    _attr_available = False
     _attr_native_max_value = 800
     _attr_native_min_value = 30
     _attr_native_step = 1
 
-    def __init__(self, api: APsystemsEZ1M, device_name: str, sensor_name: str, sensor_id: str):
+    def __init__(self, coordinator: ApSystemsDataCoordinator, device_name: str, sensor_name: str, sensor_id: str):
         """Initialize the sensor."""
-        self._api = api
+        super().__init__(coordinator)
         self._state = None
-        self._device_name = device_name
-        self._name = sensor_name
-        self._sensor_id = sensor_id
+        self._attr_name = f"APsystems {device_name} {sensor_name}"
+        self._attr_unique_id = f"apsystemsapi_{device_name}_{sensor_id}"
+        self._attr_device_info = inverter_device_info(device_name)
+
+    @callback
+    def _handle_coordinator_update(self):
+        if self.coordinator.data is not None and not self.coordinator.commands.is_pending(MAX_POWER):
+            self._state = self.coordinator.data.max_power
+        self._async_write_if_changed()
 
-    async def async_update(self):
-        try:
-            self._state = await self._api.get_max_power()
-            self._attr_available = True
-        except (TimeoutError, client_exceptions.ClientConnectionError):
-            self._attr_available = False
+    def _restore_state(self, last_state: State) -> None:
+        self._state = int(float(last_state.state))
 
     @property
-    def state(self):
+    def native_value(self) -> float | None:
         """Return the state of the sensor."""
         return self._state
 
-    @property
-    def unique_id(self) -> str | None:
-        return f"apsystemsapi_{self._device_name}_{self._sensor_id}"
-
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return f"APsystems {self._device_name} {self._name}"
-
     async def async_set_native_value(self, value: float) -> None:
-        try:
-            await self._api.set_max_power(int(value))
-            self._attr_available = True
-        except (TimeoutError, client_exceptions.ClientConnectionError):
-            self._attr_available = False
-        await self.async_update()
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return DeviceInfo(
-            identifiers={
-                ("apsystemsapi_local", self._device_name)
-            },
-            name=self._device_name,
-            manufacturer="APsystems",
-            model="EZ1-M",
-        )
+        # Show the new limit right away, the next poll confirms it.
+        self._state = int(value)
+        self._async_write_if_changed()
+        self.coordinator.commands.async_queue(MAX_POWER, int(value))
@@ -0,0 +1,180 @@
+"""On-demand profiling of the poll and state write path."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+from functools import wraps
+import json
+import os
+import pstats
+from time import perf_counter
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_platform
+from homeassistant.util import dt as dt_util
+
+from . import transport
+from .const import DATA_PROFILING, DOMAIN, LOGGER
+
+# Source file of the fast transport, as cProfile names its functions.
+TRANSPORT_FILE = transport.__file__
+
+
+class _PhaseTimes:
+    """Wall time spent in each instrumented phase."""
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, phase: str, duration: float) -> None:
+        self.totals[phase] = self.totals.get(phase, 0.0) + duration
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+
+def _instrument(
+    obj: Any, name: str, phase: str, times: _PhaseTimes, patched: list
+) -> None:
+    """Time a method of one object by shadowing it with an instance attribute.
+
+    Nothing is patched while no profile runs, so the hot path has no overhead
+    at all when profiling is disabled.
+    """
+    method = getattr(obj, name)
+    if asyncio.iscoroutinefunction(method):
+
+        @wraps(method)
+        async def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                times.add(phase, perf_counter() - start)
+
+    else:
+
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                times.add(phase, perf_counter() - start)
+
+    setattr(obj, name, timed)
+    patched.append((obj, name))
+
+
+def _is_response_decode(filename: str, function: str) -> bool:
+    """Return whether a caller of json.loads decodes an inverter response.
+
+    The library decodes through ClientResponse.json of aiohttp, the fast
+    transport calls json.loads itself. Everything else decoding JSON in the
+    process, like the websocket API or the storage helpers, is left out. Other
+    integrations using ClientResponse.json during the profile still count.
+    """
+    if function == "json":
+        return filename.endswith(os.path.join("aiohttp", "client_reqrep.py"))
+    return filename == TRANSPORT_FILE
+
+
+def _json_parse_time(stats: pstats.Stats) -> float:
+    """Return the seconds spent decoding JSON responses of the inverters."""
+    return sum(
+        cumulative
+        for (filename, _, function), (*_, callers) in stats.stats.items()
+        if function == "loads" and filename.endswith("json/__init__.py")
+        for (caller_file, _, caller), (*_, cumulative) in callers.items()
+        if _is_response_decode(caller_file, caller)
+    )
+
+
+def _summarize(times: _PhaseTimes, parse: float, duration: float) -> dict[str, Any]:
+    """Split the measured times into the phases of a poll."""
+    totals = times.totals
+    polls = times.counts.get("poll", 0)
+    update = totals.get("update", 0.0)
+    request = totals.get("request", 0.0)
+    dispatch = totals.get("dispatch", 0.0)
+    state_write = totals.get("state_write", 0.0)
+    phases = {
+        # The HTTP round trips, as seen by the poll.
+        "network_wait": max(request - parse, 0.0),
+        "parse": parse,
+        # Building the snapshot, energy integration and history.
+        "processing": max(update - request, 0.0),
+        # Entity callbacks, deadband checks and the coordinator bookkeeping.
+        "listener_dispatch": max(dispatch - state_write, 0.0),
+        "state_write": state_write,
+    }
+    return {
+        "duration": duration,
+        "polls": polls,
+        "state_writes": times.counts.get("state_write", 0),
+        "total_ms": {
+            phase: round(value * 1000, 3) for phase, value in phases.items()
+        },
+        "per_poll_ms": {
+            phase: round(value * 1000 / polls, 3) if polls else None
+            for phase, value in phases.items()
+        },
+    }
+
+
+async def async_profile(hass: HomeAssistant, duration: float) -> dict[str, Any]:
+    """Profile all loaded inverters for the duration and write the results.
+
+    Returns the summary, which is also written next to the cProfile stats file
+    in the configuration directory.
+    """
+    if hass.data.get(DATA_PROFILING):
+        raise HomeAssistantError("A profile of the APsystems inverters is running")
+    hass.data[DATA_PROFILING] = True
+
+    times = _PhaseTimes()
+    patched: list[tuple[Any, str]] = []
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        coordinator = entry_data["COORDINATOR"]
+        _instrument(coordinator, "_async_update_data", "update", times, patched)
+        _instrument(coordinator, "_async_poll", "request", times, patched)
+        _instrument(
+            coordinator, "async_update_listeners", "dispatch", times, patched
+        )
+        _instrument(coordinator, "async_fetch", "poll", times, patched)
+    for platform in entity_platform.async_get_platforms(hass, DOMAIN):
+        for entity in platform.entities.values():
+            _instrument(
+                entity, "async_write_ha_state", "state_write", times, patched
+            )
+
+    profiler = cProfile.Profile()
+    start = perf_counter()
+    profiler.enable()
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        profiler.disable()
+        for obj, name in patched:
+            # Uncover the method of the class again.
+            delattr(obj, name)
+        hass.data[DATA_PROFILING] = False
+
+    stats = pstats.Stats(profiler)
+    summary = _summarize(times, _json_parse_time(stats), perf_counter() - start)
+    prefix = hass.config.path(
+        f"{DOMAIN}.profile.{dt_util.utcnow().strftime('%Y%m%d%H%M%S')}"
+    )
+    summary["stats_file"] = f"{prefix}.prof"
+    summary["summary_file"] = f"{prefix}.json"
+    await hass.async_add_executor_job(_write_results, profiler, summary)
+    LOGGER.info("Wrote the profile of the APsystems inverters to %s", prefix)
+    return summary
+
+
+def _write_results(profiler: cProfile.Profile, summary: dict[str, Any]) -> None:
+    profiler.dump_stats(summary["stats_file"])
+    with open(summary["summary_file"], "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2)
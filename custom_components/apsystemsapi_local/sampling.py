@@ -0,0 +1,137 @@
+"""High rate sampling of the output power of an inverter."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from aiohttp import client_exceptions
+from APsystemsEZ1 import APsystemsEZ1M, ReturnOutputData
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .breaker import CircuitBreaker, CircuitOpenError
+from .const import EVENT_POWER_THRESHOLD
+from .transport import EZ1Transport
+
+
+@dataclass
+class PowerAggregate:
+    """Power of both inputs aggregated over the samples of one update interval."""
+
+    samples: int
+    latest: ReturnOutputData
+    p1_mean: float
+    p1_min: float
+    p1_max: float
+    p2_mean: float
+    p2_min: float
+    p2_max: float
+
+
+class OutputSampler:
+    """Sample the output data at a high rate between two coordinator updates.
+
+    Samples are kept in typed arrays and only published as aggregates by the
+    coordinator. The only thing published per sample is an event when the
+    total power crosses the configured threshold.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: APsystemsEZ1M | EZ1Transport,
+        breaker: CircuitBreaker,
+        device_name: str,
+        interval: float,
+        threshold: float = 0,
+        on_sample: Callable[[ReturnOutputData], None] | None = None,
+    ) -> None:
+        """Initialize the sampler."""
+        self.hass = hass
+        self.api = api
+        self.breaker = breaker
+        self.device_name = device_name
+        self.interval = interval
+        self.threshold = threshold
+        self.on_sample = on_sample
+        self._p1 = array("d")
+        self._p2 = array("d")
+        self._latest: ReturnOutputData | None = None
+        self._above_threshold: bool | None = None
+        self._sampling = False
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start sampling and return a callback to stop it."""
+        return async_track_time_interval(
+            self.hass,
+            self._async_sample,
+            timedelta(seconds=self.interval),
+            name=f"APsystems {self.device_name} sampler",
+        )
+
+    async def _async_sample(self, _now: datetime) -> None:
+        if self._sampling:
+            # The previous sample is still waiting for the inverter.
+            return
+        self._sampling = True
+        try:
+            data = await self.breaker.async_call(self.api.get_output_data)
+        except (
+            CircuitOpenError,
+            TimeoutError,
+            client_exceptions.ClientConnectionError,
+        ):
+            return
+        finally:
+            self._sampling = False
+        if data is None:
+            return
+        self._latest = data
+        self._p1.append(data.p1)
+        self._p2.append(data.p2)
+        if self.on_sample is not None:
+            self.on_sample(data)
+        self._check_threshold(data.p1 + data.p2)
+
+    @callback
+    def _check_threshold(self, power: float) -> None:
+        if not self.threshold:
+            return
+        above = power > self.threshold
+        if self._above_threshold is not None and above != self._above_threshold:
+            self.hass.bus.async_fire(
+                EVENT_POWER_THRESHOLD,
+                {
+                    "device_name": self.device_name,
+                    "power": power,
+                    "threshold": self.threshold,
+                    "above": above,
+                },
+            )
+        self._above_threshold = above
+
+    @callback
+    def async_aggregate(self) -> PowerAggregate | None:
+        """Return the aggregate of the samples since the last call and reset them."""
+        if not self._p1 or self._latest is None:
+            return None
+        count = len(self._p1)
+        aggregate = PowerAggregate(
+            samples=count,
+            latest=self._latest,
+            p1_mean=round(sum(self._p1) / count, 1),
+            p1_min=min(self._p1),
+            p1_max=max(self._p1),
+            p2_mean=round(sum(self._p2) / count, 1),
+            p2_min=min(self._p2),
+            p2_max=max(self._p2),
+        )
+        # Reuse the allocated buffers for the next interval.
+        del self._p1[:]
+        del self._p2[:]
+        return aggregate
@@ -1,24 +1,44 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+from APsystemsEZ1 import ReturnOutputData
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.components.sensor import (
     PLATFORM_SCHEMA,
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME, UnitOfEnergy, UnitOfPower
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import (
+    CONF_IP_ADDRESS,
+    CONF_NAME,
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, State, callback
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.typing import DiscoveryInfoType
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.typing import DiscoveryInfoType, StateType
+from homeassistant.util import dt as dt_util
 
-from . import ApSystemsDataCoordinator
-from .const import DOMAIN
+from . import ApSystemsDataCoordinator, ApSystemsSensorData
+from .const import DATA_SITE, DOMAIN, SITE, SITE_ID
+from .derived import DerivedStatistics
+from .energy import MAX_RESTART_DROP
+from .entity import ApSystemsRestoreEntity, inverter_device_info
+from .sampling import PowerAggregate
+from .site import SiteAggregate
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
@@ -28,6 +48,334 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
 )
 
 
+@dataclass(frozen=True, kw_only=True)
+class ApSystemsSensorEntityDescription(SensorEntityDescription):
+    """Describes an APsystems sensor read from the polled snapshot."""
+
+    value_fn: Callable[[ApSystemsSensorData], StateType]
+    # Whether changes inside the configured power deadband are ignored.
+    deadband: bool = False
+    # Whether a drop of at most MAX_RESTART_DROP is held at the last state.
+    hold_restart_drop: bool = False
+
+
+@dataclass(frozen=True, kw_only=True)
+class ApSystemsDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes a performance metric of the coordinator."""
+
+    value_fn: Callable[[ApSystemsDataCoordinator], StateType | datetime]
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+    entity_registry_enabled_default: bool = False
+
+
+@dataclass(frozen=True, kw_only=True)
+class ApSystemsSiteSensorEntityDescription(SensorEntityDescription):
+    """Describes a total of the site aggregate device."""
+
+    value_fn: Callable[[SiteAggregate], StateType]
+
+
+def _output(
+    value_fn: Callable[[ReturnOutputData], StateType]
+) -> Callable[[ApSystemsSensorData], StateType]:
+    return lambda data: (
+        None if data.output_data is None else value_fn(data.output_data)
+    )
+
+
+def _aggregate(
+    value_fn: Callable[[PowerAggregate], StateType]
+) -> Callable[[ApSystemsSensorData], StateType]:
+    return lambda data: (
+        None if data.power_aggregate is None else value_fn(data.power_aggregate)
+    )
+
+
+def _statistics(
+    value_fn: Callable[[DerivedStatistics], StateType]
+) -> Callable[[ApSystemsSensorData], StateType]:
+    return lambda data: (
+        None if data.statistics is None else value_fn(data.statistics)
+    )
+
+
+def _share(
+    key: str, name: str, value_fn: Callable[[DerivedStatistics], StateType]
+) -> ApSystemsSensorEntityDescription:
+    return ApSystemsSensorEntityDescription(
+        key=key,
+        name=name,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_statistics(value_fn),
+    )
+
+
+def _power(
+    key: str, name: str, value_fn: Callable[[ApSystemsSensorData], StateType]
+) -> ApSystemsSensorEntityDescription:
+    return ApSystemsSensorEntityDescription(
+        key=key,
+        name=name,
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=value_fn,
+        deadband=True,
+    )
+
+
+def _energy(
+    key: str,
+    name: str,
+    state_class: SensorStateClass,
+    value_fn: Callable[[ApSystemsSensorData], StateType],
+    hold_restart_drop: bool = False,
+) -> ApSystemsSensorEntityDescription:
+    return ApSystemsSensorEntityDescription(
+        key=key,
+        name=name,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=state_class,
+        value_fn=value_fn,
+        hold_restart_drop=hold_restart_drop,
+    )
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+SENSORS: tuple[ApSystemsSensorEntityDescription, ...] = (
+    _power("total_power", "Total Power", _output(lambda data: data.p1 + data.p2)),
+    _power("total_power_p1", "Power P1", _output(lambda data: data.p1)),
+    _power("total_power_p2", "Power P2", _output(lambda data: data.p2)),
+    _energy(
+        "lifetime_production",
+        "Lifetime Production",
+        SensorStateClass.TOTAL,
+        _output(lambda data: data.te1 + data.te2),
+    ),
+    _energy(
+        "lifetime_production_p1",
+        "Lifetime Production P1",
+        SensorStateClass.TOTAL,
+        _output(lambda data: data.te1),
+    ),
+    _energy(
+        "lifetime_production_p2",
+        "Lifetime Production P2",
+        SensorStateClass.TOTAL,
+        _output(lambda data: data.te2),
+    ),
+    _energy(
+        "lifetime_production_precise",
+        "Lifetime Production Precise",
+        SensorStateClass.TOTAL_INCREASING,
+        lambda data: (
+            None
+            if data.precise_te1 is None or data.precise_te2 is None
+            else round(data.precise_te1 + data.precise_te2, 4)
+        ),
+        # The integrators restart from the coarse device counters.
+        hold_restart_drop=True,
+    ),
+    _energy(
+        "lifetime_production_precise_p1",
+        "Lifetime Production Precise P1",
+        SensorStateClass.TOTAL_INCREASING,
+        lambda data: data.precise_te1,
+        hold_restart_drop=True,
+    ),
+    _energy(
+        "lifetime_production_precise_p2",
+        "Lifetime Production Precise P2",
+        SensorStateClass.TOTAL_INCREASING,
+        lambda data: data.precise_te2,
+        hold_restart_drop=True,
+    ),
+    _energy(
+        "today_production",
+        "Today Production",
+        SensorStateClass.TOTAL_INCREASING,
+        _output(lambda data: data.e1 + data.e2),
+    ),
+    _energy(
+        "today_production_p1",
+        "Today Production P1",
+        SensorStateClass.TOTAL_INCREASING,
+        _output(lambda data: data.e1),
+    ),
+    _energy(
+        "today_production_p2",
+        "Today Production P2",
+        SensorStateClass.TOTAL_INCREASING,
+        _output(lambda data: data.e2),
+    ),
+)
+
+# Computed by the coordinator from the polled or sampled output.
+STATISTICS_SENSORS: tuple[ApSystemsSensorEntityDescription, ...] = (
+    _power(
+        "peak_power_today",
+        "Peak Power Today",
+        _statistics(lambda data: data.peak_power_today),
+    ),
+    _power(
+        "mean_power_5min",
+        "Mean Power 5 Min",
+        _statistics(lambda data: data.mean_power_5min),
+    ),
+    _power(
+        "mean_power_15min",
+        "Mean Power 15 Min",
+        _statistics(lambda data: data.mean_power_15min),
+    ),
+    _share("p1_share", "P1 Share", lambda data: data.p1_share),
+    _share("p2_share", "P2 Share", lambda data: data.p2_share),
+)
+
+# Only added when sampling is enabled.
+AGGREGATE_SENSORS: tuple[ApSystemsSensorEntityDescription, ...] = (
+    _power("power_p1_mean", "Power P1 Mean", _aggregate(lambda data: data.p1_mean)),
+    _power("power_p1_min", "Power P1 Min", _aggregate(lambda data: data.p1_min)),
+    _power("power_p1_max", "Power P1 Max", _aggregate(lambda data: data.p1_max)),
+    _power("power_p2_mean", "Power P2 Mean", _aggregate(lambda data: data.p2_mean)),
+    _power("power_p2_min", "Power P2 Min", _aggregate(lambda data: data.p2_min)),
+    _power("power_p2_max", "Power P2 Max", _aggregate(lambda data: data.p2_max)),
+)
+
+DIAGNOSTIC_SENSORS: tuple[ApSystemsDiagnosticSensorEntityDescription, ...] = (
+    ApSystemsDiagnosticSensorEntityDescription(
+        key="poll_latency",
+        name="Poll Latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _milliseconds(
+            coordinator.metrics.latency_percentile(95)
+        ),
+    ),
+    ApSystemsDiagnosticSensorEntityDescription(
+        key="request_timeout",
+        name="Request Timeout",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _milliseconds(
+            coordinator.request_timeout.value
+        ),
+    ),
+    ApSystemsDiagnosticSensorEntityDescription(
+        key="poll_timeouts",
+        name="Poll Timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.timeouts,
+    ),
+    ApSystemsDiagnosticSensorEntityDescription(
+        key="poll_errors",
+        name="Poll Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.errors,
+    ),
+    ApSystemsDiagnosticSensorEntityDescription(
+        key="poll_overruns",
+        name="Poll Overruns",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.overruns,
+    ),
+    ApSystemsDiagnosticSensorEntityDescription(
+        key="consecutive_poll_failures",
+        name="Consecutive Poll Failures",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.consecutive_failures,
+    ),
+    ApSystemsDiagnosticSensorEntityDescription(
+        key="last_successful_poll",
+        name="Last Successful Poll",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda coordinator: coordinator.metrics.last_success,
+    ),
+    ApSystemsDiagnosticSensorEntityDescription(
+        key="listener_dispatch_time",
+        name="Listener Dispatch Time",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _milliseconds(
+            coordinator.metrics.last_dispatch_time
+        ),
+    ),
+)
+
+# Only added when the zero-export controller is enabled.
+EXPORT_CONTROLLER_SENSORS: tuple[ApSystemsDiagnosticSensorEntityDescription, ...] = (
+    ApSystemsDiagnosticSensorEntityDescription(
+        key="zero_export_latency",
+        name="Zero Export Latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        value_fn=lambda coordinator: _milliseconds(
+            coordinator.export_controller.latency_percentile(95)
+        ),
+    ),
+    ApSystemsDiagnosticSensorEntityDescription(
+        key="zero_export_writes",
+        name="Zero Export Writes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=True,
+        value_fn=lambda coordinator: coordinator.export_controller.writes,
+    ),
+)
+
+
+SITE_SENSORS: tuple[ApSystemsSiteSensorEntityDescription, ...] = (
+    ApSystemsSiteSensorEntityDescription(
+        key="total_power",
+        name="Total Power",
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda site: round(site.power, 2),
+    ),
+    ApSystemsSiteSensorEntityDescription(
+        key="today_production",
+        name="Today Production",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda site: (
+            round(site.today_energy, 5) if site.energy_known else None
+        ),
+    ),
+    ApSystemsSiteSensorEntityDescription(
+        key="lifetime_production",
+        name="Lifetime Production",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda site: (
+            round(site.lifetime_energy, 5) if site.energy_known else None
+        ),
+    ),
+    ApSystemsSiteSensorEntityDescription(
+        key="available_inverters",
+        name="Available Inverters",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda site: site.available,
+    ),
+    ApSystemsSiteSensorEntityDescription(
+        key="inverters",
+        name="Inverters",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda site: site.inverters,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: config_entries.ConfigEntry,
@@ -35,207 +383,183 @@ async def async_setup_entry(
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the sensor platform."""
+    if config_entry.data.get(SITE, False):
+        site_device_info = DeviceInfo(
+            identifiers={(DOMAIN, SITE_ID)},
+            name="APsystems Site",
+            manufacturer="APsystems",
+            model="Site",
+        )
+        add_entities(
+            ApSystemsSiteSensor(hass.data[DATA_SITE], description, site_device_info)
+            for description in SITE_SENSORS
+        )
+        return
     config = hass.data[DOMAIN][config_entry.entry_id]
     coordinator = config["COORDINATOR"]
-
-    sensors = [
-        PowerSensorTotal(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Total Power",
-            sensor_id="total_power",
-        ),
-        PowerSensorTotalP1(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Power P1",
-            sensor_id="total_power_p1",
-        ),
-        PowerSensorTotalP2(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Power P2",
-            sensor_id="total_power_p2",
-        ),
-        LifetimeEnergy(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Lifetime Production",
-            sensor_id="lifetime_production",
-        ),
-        LifetimeEnergyP1(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Lifetime Production P1",
-            sensor_id="lifetime_production_p1",
-        ),
-        LifetimeEnergyP2(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Lifetime Production P2",
-            sensor_id="lifetime_production_p2",
-        ),
-        TodayEnergy(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Today Production",
-            sensor_id="today_production",
-        ),
-        TodayEnergyP1(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Today Production P1",
-            sensor_id="today_production_p1",
-        ),
-        TodayEnergyP2(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Today Production P2",
-            sensor_id="today_production_p2",
-        ),
+    device_name = config[CONF_NAME]
+    # Built once and shared by all entities of the entry.
+    device_info = inverter_device_info(device_name)
+
+    descriptions = (*SENSORS, *STATISTICS_SENSORS)
+    if coordinator.energy_statistics is not None:
+        # The hourly statistics are imported directly, so the recorder does
+        # not have to compile them from the states of the energy sensors.
+        descriptions = tuple(
+            replace(description, state_class=None)
+            if description.device_class == SensorDeviceClass.ENERGY
+            else description
+            for description in descriptions
+        )
+    sensors: list[ApSystemsSensor] = [
+        ApSystemsSensor(coordinator, description, device_name, device_info)
+        for description in descriptions
     ]
+    if coordinator.sampler is not None:
+        sensors.extend(
+            ApSystemsSensor(coordinator, description, device_name, device_info)
+            for description in AGGREGATE_SENSORS
+        )
+    sensors.extend(
+        ApSystemsDiagnosticSensor(coordinator, description, device_name, device_info)
+        for description in DIAGNOSTIC_SENSORS
+    )
+    if coordinator.export_controller is not None:
+        sensors.extend(
+            ApSystemsDiagnosticSensor(
+                coordinator, description, device_name, device_info
+            )
+            for description in EXPORT_CONTROLLER_SENSORS
+        )
 
     add_entities(sensors)
 
 
-class BaseSensor(CoordinatorEntity, SensorEntity):
+class ApSystemsSensor(ApSystemsRestoreEntity, SensorEntity):
     """Representation of an APsystem sensor."""
 
+    entity_description: ApSystemsSensorEntityDescription
 
     def __init__(
         self,
         coordinator: ApSystemsDataCoordinator,
+        description: SensorEntityDescription,
         device_name: str,
-        sensor_name: str,
-        sensor_id: str,
+        device_info: DeviceInfo,
     ):
         """Initialize the sensor."""
         super().__init__(coordinator)
-        self._state = None
-        self._device_name = device_name
-        self._sensor_name = sensor_name
-        self._sensor_id = sensor_id
-
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return f"{self._device_name} {self._sensor_name}"
-
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        return self._state
-
-    @property
-    def unique_id(self) -> str | None:
-        return f"apsystemsapi_{self._device_name}_{self._sensor_id}"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return DeviceInfo(
-            identifiers={("apsystemsapi_local", self._device_name)},
-            name=self._device_name,
-            manufacturer="APsystems",
-            model="EZ1-M",
+        self.entity_description = description
+        # Identity is fixed for the lifetime of the entity, so compute it once.
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_unique_id = f"apsystemsapi_{device_name}_{description.key}"
+        self._attr_device_info = device_info
+
+    def _restore_state(self, last_state: State) -> None:
+        if self.device_class == SensorDeviceClass.TIMESTAMP:
+            self._attr_native_value = dt_util.parse_datetime(last_state.state)
+            return
+        try:
+            self._attr_native_value = float(last_state.state)
+        except ValueError:
+            # Not a number this sensor can show, start unknown instead.
+            pass
+
+    def _publish_value(self) -> StateType | datetime:
+        return self.native_value
+
+    def _state_changed(self, old, new) -> bool:
+        """Return whether the new state is worth publishing."""
+        if not self.entity_description.deadband or old is None or new is None:
+            return old != new
+        # Ignore changes inside the configured deadband.
+        deadband = max(
+            self.coordinator.power_deadband,
+            abs(old) * self.coordinator.power_deadband_percent / 100,
+        )
+        return abs(new - old) > deadband
+
+    def _is_restart_drop(self, value: StateType) -> bool:
+        """Return whether the value is a small drop to hold at the last state."""
+        last = self._attr_native_value
+        return (
+            self.entity_description.hold_restart_drop
+            and isinstance(last, float)
+            and isinstance(value, float)
+            and last - MAX_RESTART_DROP <= value < last
         )
-
-    #     @callback
-    # def _handle_coordinator_update(self):
-    #     raise NotImplementedError("Must be implemented by subclasses.")
-
-
-class BasePowerSensor(BaseSensor):
-    _device_class = SensorDeviceClass.POWER
-    _attr_native_unit_of_measurement = UnitOfPower.WATT
-    _attr_device_class = SensorDeviceClass.POWER
-    _attr_state_class = SensorStateClass.MEASUREMENT
-
-
-class PowerSensorTotal(BasePowerSensor):
-    @callback
-    def _handle_coordinator_update(self):
-        if self.coordinator.data is not None:
-            self._state = self.coordinator.data.p1 + self.coordinator.data.p2
-        self.async_write_ha_state()
-
-
-class PowerSensorTotalP1(BasePowerSensor):
-    @callback
-    def _handle_coordinator_update(self):
-        if self.coordinator.data is not None:
-            self._state = self.coordinator.data.p1
-        self.async_write_ha_state()
-
-
-class PowerSensorTotalP2(BasePowerSensor):
-    @callback
-    def _handle_coordinator_update(self):
-        if self.coordinator.data is not None:
-            self._state = self.coordinator.data.p2
-        self.async_write_ha_state()
-
-
-class BaseEnergySensor(BaseSensor):
-    _device_class = SensorDeviceClass.ENERGY
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-
-
-class LifetimeEnergy(BaseEnergySensor):
-    _attr_state_class = SensorStateClass.TOTAL
 
     @callback
-    def _handle_coordinator_update(self):
-        if self.coordinator.data is not None:
-            self._state = self.coordinator.data.te1 + self.coordinator.data.te2
-        self.async_write_ha_state()
+    def _handle_coordinator_update(self) -> None:
+        if self.coordinator.data is not None and (
+            value := self.entity_description.value_fn(self.coordinator.data)
+        ) is not None:
+            if not self._is_restart_drop(value):
+                self._attr_native_value = value
+        self._async_write_if_changed()
 
 
-class LifetimeEnergyP1(BaseEnergySensor):
-    _attr_state_class = SensorStateClass.TOTAL
-
-    @callback
-    def _handle_coordinator_update(self):
-        if self.coordinator.data is not None:
-            self._state = self.coordinator.data.te1
-        self.async_write_ha_state()
+class ApSystemsDiagnosticSensor(ApSystemsSensor):
+    """Performance metric of the coordinator, disabled by default."""
 
+    entity_description: ApSystemsDiagnosticSensorEntityDescription
 
-class LifetimeEnergyP2(BaseEnergySensor):
-    _attr_state_class = SensorStateClass.TOTAL
+    @property
+    def should_poll(self) -> bool:
+        # The metrics change on every poll, even when the inverter data does
+        # not and the coordinator skips its listeners.
+        return True
 
-    @callback
-    def _handle_coordinator_update(self):
-        if self.coordinator.data is not None:
-            self._state = self.coordinator.data.te2
-        self.async_write_ha_state()
+    @property
+    def available(self) -> bool:
+        return True
 
+    def _state_changed(self, old, new) -> bool:
+        return old != new
 
-class TodayEnergy(BaseEnergySensor):
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    async def async_update(self) -> None:
+        self._attr_native_value = self.entity_description.value_fn(
+            self.coordinator
+        )
 
     @callback
-    def _handle_coordinator_update(self):
-        if self.coordinator.data is not None:
-            self._state = self.coordinator.data.e1 + self.coordinator.data.e2
-        self.async_write_ha_state()
-
+    def _handle_coordinator_update(self) -> None:
+        self._attr_native_value = self.entity_description.value_fn(
+            self.coordinator
+        )
+        self._async_write_if_changed()
 
-class TodayEnergyP1(BaseEnergySensor):
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
 
-    @callback
-    def _handle_coordinator_update(self):
-        if self.coordinator.data is not None:
-            self._state = self.coordinator.data.e1
-        self.async_write_ha_state()
+class ApSystemsSiteSensor(RestoreSensor):
+    """Total of all inverters, published once per poll round."""
 
+    entity_description: ApSystemsSiteSensorEntityDescription
+    _attr_should_poll = False
 
-class TodayEnergyP2(BaseEnergySensor):
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    def __init__(
+        self,
+        site: SiteAggregate,
+        description: ApSystemsSiteSensorEntityDescription,
+        device_info: DeviceInfo,
+    ) -> None:
+        """Initialize the sensor."""
+        self.site = site
+        self.entity_description = description
+        self._attr_name = f"Site {description.name}"
+        self._attr_unique_id = f"{SITE_ID}_{description.key}"
+        self._attr_device_info = device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last total and follow the site."""
+        await super().async_added_to_hass()
+        if (last_data := await self.async_get_last_sensor_data()) is not None:
+            # Shown until the counters of every inverter are known again.
+            self._attr_native_value = last_data.native_value
+        self.async_on_remove(self.site.async_add_listener(self._handle_site_update))
+        self._handle_site_update()
 
     @callback
-    def _handle_coordinator_update(self):
-        if self.coordinator.data is not None:
-            self._state = self.coordinator.data.e2
+    def _handle_site_update(self) -> None:
+        if (value := self.entity_description.value_fn(self.site)) is not None:
+            self._attr_native_value = value
         self.async_write_ha_state()
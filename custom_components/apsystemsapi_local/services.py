@@ -0,0 +1,104 @@
+"""Services of the APsystems local API integration."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import device_registry as dr
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .history import FIELDS
+from .profiling import async_profile
+
+SERVICE_GET_SAMPLES = "get_samples"
+SERVICE_PROFILE = "profile"
+
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_DURATION = "duration"
+
+# Window returned when no start is given.
+DEFAULT_WINDOW = timedelta(minutes=10)
+
+GET_SAMPLES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_get_samples(call: ServiceCall) -> ServiceResponse:
+        """Return the stored output samples of an inverter in a time window."""
+        device = dr.async_get(hass).async_get(call.data[ATTR_DEVICE_ID])
+        entries = hass.data.get(DOMAIN, {})
+        entry_id = next(
+            (
+                entry_id
+                for entry_id in (device.config_entries if device else ())
+                if entry_id in entries
+            ),
+            None,
+        )
+        if entry_id is None:
+            raise ServiceValidationError(
+                f"{call.data[ATTR_DEVICE_ID]} is not a loaded APsystems inverter"
+            )
+        history = entries[entry_id]["COORDINATOR"].history
+
+        end = dt_util.as_utc(call.data.get(ATTR_END, dt_util.utcnow()))
+        start = dt_util.as_utc(call.data.get(ATTR_START, end - DEFAULT_WINDOW))
+        return {
+            "samples": [
+                {
+                    **dict(zip(FIELDS[1:], sample[1:])),
+                    "timestamp": dt_util.utc_from_timestamp(sample[0]).isoformat(),
+                }
+                for sample in history.window(start.timestamp(), end.timestamp())
+            ]
+        }
+
+    async def async_profile_inverters(call: ServiceCall) -> ServiceResponse:
+        """Profile the poll and state write path of all inverters."""
+        return await async_profile(hass, call.data[ATTR_DURATION])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile_inverters,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SAMPLES,
+        async_get_samples,
+        schema=GET_SAMPLES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,223 @@
+"""Running totals of the power and energy of all inverters of a site."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_change
+
+
+if TYPE_CHECKING:
+    from . import ApSystemsDataCoordinator
+
+
+@dataclass
+class _Contribution:
+    """What one inverter currently adds to the totals."""
+
+    power: float = 0.0
+    today_energy: float = 0.0
+    lifetime_energy: float = 0.0
+    available: bool = False
+    # Whether the energy counters were read at least once.
+    reported: bool = False
+
+
+class SiteAggregate:
+    """Sum the power and energy of all inverters, one delta per update.
+
+    Every inverter update replaces only its own contribution, so keeping the
+    totals costs constant time however many inverters there are. An
+    unavailable inverter adds no power and keeps its last energy counters.
+    The energy totals stay unknown until every inverter reported once, so a
+    partial sum is never published as a drop of the counters.
+
+    The totals are published once per poll round: as soon as every inverter
+    reported, or after the shortest poll interval if one of them is late.
+    Contributions are kept per config entry, so reloading an entry does not
+    make the totals dip.
+
+    It only exists while the config entry of the site is loaded, without it
+    the inverters are not registered and do not update any totals.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the site."""
+        self.hass = hass
+        self.power = 0.0
+        self.today_energy = 0.0
+        self.lifetime_energy = 0.0
+        self.available = 0
+        self.publishes = 0
+        self._contributions: dict[str, _Contribution] = {}
+        self._coordinators: dict[str, ApSystemsDataCoordinator] = {}
+        self._unreported = 0
+        self._round: set[str] = set()
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsub_publish: CALLBACK_TYPE | None = None
+        self._unsub_midnight: CALLBACK_TYPE | None = None
+
+    @property
+    def inverters(self) -> int:
+        """Return the number of inverters summed up."""
+        return len(self._contributions)
+
+    @property
+    def energy_known(self) -> bool:
+        """Return whether the energy counters of every inverter are known."""
+        return not self._unreported
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call back when the totals are published and return a callback to stop."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    @callback
+    def async_register(
+        self, entry_id: str, coordinator: ApSystemsDataCoordinator
+    ) -> None:
+        """Add the inverter of a loaded config entry."""
+        coordinator.site = self
+        self._coordinators[entry_id] = coordinator
+        if entry_id not in self._contributions:
+            self._contributions[entry_id] = _Contribution()
+            self._unreported += 1
+        if self._unsub_midnight is None:
+            self._unsub_midnight = async_track_time_change(
+                self.hass, self._async_midnight, hour=0, minute=0, second=0
+            )
+
+    @callback
+    def async_unregister(self, entry_id: str) -> None:
+        """Stop following the inverter of an unloaded config entry."""
+        if (coordinator := self._coordinators.pop(entry_id, None)) is None:
+            return
+        coordinator.site = None
+        self._round.discard(entry_id)
+        # An unloaded inverter counts as unavailable until it is removed.
+        self._async_apply(entry_id, None)
+        if not self._coordinators and self._unsub_midnight is not None:
+            self._unsub_midnight()
+            self._unsub_midnight = None
+        self._async_publish()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop following all inverters when the site entry is unloaded."""
+        for coordinator in self._coordinators.values():
+            coordinator.site = None
+        self._coordinators.clear()
+        self._round.clear()
+        for unsub in (self._unsub_publish, self._unsub_midnight):
+            if unsub is not None:
+                unsub()
+        self._unsub_publish = self._unsub_midnight = None
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Drop the contribution of a removed config entry."""
+        if (old := self._contributions.pop(entry_id, None)) is None:
+            return
+        self.power -= old.power
+        self.today_energy -= old.today_energy
+        self.lifetime_energy -= old.lifetime_energy
+        self.available -= old.available
+        self._unreported -= not old.reported
+        self._async_publish()
+
+    @callback
+    def async_update(self, entry_id: str) -> None:
+        """Apply the result of a poll of an inverter to the totals."""
+        coordinator = self._coordinators[entry_id]
+        data = coordinator.output_data
+        if (
+            coordinator.last_update_success
+            and coordinator.breaker.available
+            and data is not None
+        ):
+            self._async_apply(
+                entry_id,
+                _Contribution(
+                    power=data.p1 + data.p2,
+                    today_energy=data.e1 + data.e2,
+                    lifetime_energy=data.te1 + data.te2,
+                    available=True,
+                    reported=True,
+                ),
+            )
+        else:
+            self._async_apply(entry_id, None)
+        self._round.add(entry_id)
+        if len(self._round) >= len(self._coordinators):
+            self._async_publish()
+        else:
+            self._async_schedule_publish()
+
+    @callback
+    def _async_apply(self, entry_id: str, new: _Contribution | None) -> None:
+        old = self._contributions[entry_id]
+        if new is None:
+            # No power, but the energy counters keep their last value.
+            new = _Contribution(
+                today_energy=old.today_energy,
+                lifetime_energy=old.lifetime_energy,
+                reported=old.reported,
+            )
+        self.power += new.power - old.power
+        self.today_energy += new.today_energy - old.today_energy
+        self.lifetime_energy += new.lifetime_energy - old.lifetime_energy
+        self.available += new.available - old.available
+        self._unreported -= new.reported - old.reported
+        self._contributions[entry_id] = new
+
+    @callback
+    def _async_schedule_publish(self) -> None:
+        if self._unsub_publish is not None or not self._coordinators:
+            return
+        delay = min(
+            coordinator.base_interval.total_seconds()
+            for coordinator in self._coordinators.values()
+        )
+        self._unsub_publish = async_call_later(
+            self.hass, delay, self._async_publish_late
+        )
+
+    @callback
+    def _async_publish_late(self, _now: datetime) -> None:
+        self._unsub_publish = None
+        self._async_publish()
+
+    @callback
+    def _async_publish(self) -> None:
+        if self._unsub_publish is not None:
+            self._unsub_publish()
+            self._unsub_publish = None
+        self._round.clear()
+        self.publishes += 1
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def _async_midnight(self, _now: datetime) -> None:
+        """Start the day of the inverters that can not reset their own counter."""
+        for contribution in self._contributions.values():
+            if not contribution.available and contribution.today_energy:
+                self.today_energy -= contribution.today_energy
+                contribution.today_energy = 0.0
+        self._async_publish()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the totals for the diagnostics download."""
+        return {
+            "inverters": self.inverters,
+            "available": self.available,
+            "power": self.power,
+            "today_energy": self.today_energy,
+            "lifetime_energy": self.lifetime_energy,
+            "energy_known": self.energy_known,
+            "publishes": self.publishes,
+        }
@@ -1,9 +1,6 @@
 from __future__ import annotations
 
-import asyncio
-
-from aiohttp import client_exceptions
-from APsystemsEZ1 import APsystemsEZ1M, Status
+from APsystemsEZ1 import Status
 import voluptuous as vol
 
 from homeassistant import config_entries
@@ -12,14 +9,16 @@ from homeassistant.components.switch import (
     SwitchDeviceClass,
     SwitchEntity,
 )
-from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME, STATE_ON
+from homeassistant.core import HomeAssistant, State, callback
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import DiscoveryInfoType
 
+from . import ApSystemsDataCoordinator
+from .commands import POWER_STATUS
 from .const import DOMAIN
+from .entity import ApSystemsRestoreEntity, inverter_device_info
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Required(CONF_IP_ADDRESS): cv.string,
@@ -35,73 +34,49 @@ async def async_setup_entry(
 ) -> None:
     """Set up the sensor platform."""
     config = hass.data[DOMAIN][config_entry.entry_id]
-    api = APsystemsEZ1M(ip_address=config[CONF_IP_ADDRESS])
+    coordinator = config["COORDINATOR"]
 
     numbers = [
-        MaxPower(api, device_name=config[CONF_NAME], sensor_name="Power Status", sensor_id="power_status")
+        MaxPower(coordinator, device_name=config[CONF_NAME], sensor_name="Power Status", sensor_id="power_status")
     ]
 
-    add_entities(numbers, True)
+    add_entities(numbers)
 
 
-class MaxPower(SwitchEntity):
-    _attr_available = False
+class MaxPower(ApSystemsRestoreEntity, SwitchEntity):
     _attr_device_class = SwitchDeviceClass.SWITCH
 
-    def __init__(self, api: APsystemsEZ1M, device_name: str, sensor_name: str, sensor_id: str):
+    def __init__(self, coordinator: ApSystemsDataCoordinator, device_name: str, sensor_name: str, sensor_id: str):
         """Initialize the sensor."""
-        self._api = api
+        super().__init__(coordinator)
         self._state = None
-        self._device_name = device_name
-        self._name = sensor_name
-        self._sensor_id = sensor_id
-
-    async def async_update(self):
-        try:
-            status = await self._api.get_device_power_status()
-            if status == Status.normal:
-                self._state = True
-            else:
-                self._state = False
-            self._attr_available = True
-        except (client_exceptions.ClientConnectionError, asyncio.TimeoutError):
-            self._attr_available = False
-
-    @property
-    def unique_id(self) -> str | None:
-        return f"apsystemsapi_{self._device_name}_{self._sensor_id}"
-
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return f"APsystems {self._device_name} {self._name}"
+        self._attr_name = f"APsystems {device_name} {sensor_name}"
+        self._attr_unique_id = f"apsystemsapi_{device_name}_{sensor_id}"
+        self._attr_device_info = inverter_device_info(device_name)
+
+    @callback
+    def _handle_coordinator_update(self):
+        if (
+            self.coordinator.data is not None
+            and self.coordinator.data.power_status is not None
+            and not self.coordinator.commands.is_pending(POWER_STATUS)
+        ):
+            self._state = self.coordinator.data.power_status == Status.normal
+        self._async_write_if_changed()
+
+    def _restore_state(self, last_state: State) -> None:
+        self._state = last_state.state == STATE_ON
 
     async def async_turn_on(self, **kwargs):
-        try:
-            await self._api.set_device_power_status(0)
-            self._attr_available = True
-        except ((client_exceptions.ClientConnectionError, asyncio.TimeoutError), asyncio.TimeoutError):
-            self._attr_available = False
-        await self.async_update()
+        # Show the new status right away, the next poll confirms it.
+        self._state = True
+        self._async_write_if_changed()
+        self.coordinator.commands.async_queue(POWER_STATUS, Status.normal)
 
     async def async_turn_off(self, **kwargs):
-        try:
-            await self._api.set_device_power_status(1)
-            self._attr_available = True
-        except (client_exceptions.ClientConnectionError, asyncio.TimeoutError):
-            self._attr_available = False
-        await self.async_update()
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return DeviceInfo(
-            identifiers={
-                ("apsystemsapi_local", self._device_name)
-            },
-            name=self._device_name,
-            manufacturer="APsystems",
-            model="EZ1-M",
-        )
+        self._state = False
+        self._async_write_if_changed()
+        self.coordinator.commands.async_queue(POWER_STATUS, Status.alarm)
 
     @property
     def is_on(self) -> bool | None:
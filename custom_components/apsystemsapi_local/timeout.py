@@ -0,0 +1,66 @@
+"""Request timeouts derived from the observed round-trip times of an inverter."""
+
+from __future__ import annotations
+
+from collections import deque
+
+from .const import DEFAULT_MAX_TIMEOUT, DEFAULT_MIN_TIMEOUT
+
+# Percentile of the recent round-trip times the timeout is based on.
+RTT_PERCENTILE = 95
+# Multiple of that percentile a request may take before it times out.
+SAFETY_FACTOR = 3
+# Number of recent round-trip times the estimate is computed from.
+RTT_WINDOW = 50
+# Round-trip times needed before the estimate replaces the upper bound.
+MIN_SAMPLES = 5
+
+
+class AdaptiveTimeout:
+    """Timeout of the requests to one inverter.
+
+    Starts at the upper bound and follows a high percentile of the recent
+    round-trip times once enough of them are known. Every timeout doubles it,
+    so a link that became slower is not cut off before it was measured.
+    """
+
+    def __init__(
+        self,
+        minimum: float = DEFAULT_MIN_TIMEOUT,
+        maximum: float = DEFAULT_MAX_TIMEOUT,
+    ) -> None:
+        """Initialize the timeout."""
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.value = self.maximum
+        self._rtts: deque[float] = deque(maxlen=RTT_WINDOW)
+
+    def set_bounds(self, minimum: float, maximum: float) -> float:
+        """Change the bounds, and return the timeout."""
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.value = self._clamp(self.value)
+        return self.value
+
+    def _clamp(self, value: float) -> float:
+        return round(min(self.maximum, max(self.minimum, value)), 3)
+
+    def record_success(self, rtt: float) -> float:
+        """Record the round-trip time of a successful request and return the timeout."""
+        self._rtts.append(rtt)
+        if len(self._rtts) >= MIN_SAMPLES:
+            ordered = sorted(self._rtts)
+            percentile = ordered[
+                min(len(ordered) - 1, int(RTT_PERCENTILE / 100 * len(ordered)))
+            ]
+            self.value = self._clamp(percentile * SAFETY_FACTOR)
+        return self.value
+
+    def record_timeout(self, timeout: float) -> float:
+        """Record a request that ran out of the given timeout and return the timeout.
+
+        Doubling the timeout the request had, not the current one, keeps
+        concurrent requests that time out together from compounding.
+        """
+        self.value = self._clamp(max(self.value, timeout * 2))
+        return self.value
@@ -0,0 +1,236 @@
+"""Lightweight HTTP/1.1 client for the fixed endpoints of the EZ1 local API."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+from aiohttp import client_exceptions
+from aiohttp.http_exceptions import HttpBadRequest
+from APsystemsEZ1 import (
+    InverterReturnedError,
+    ReturnAlarmInfo,
+    ReturnDeviceInfo,
+    ReturnOutputData,
+    Status,
+)
+
+from .const import MAX_CONNECTIONS_PER_HOST
+
+# Values accepted by set_device_power_status, the same as the library takes.
+POWER_STATUS_VALUES = {"0": "0", "ON": "0", "1": "1", "SLEEP": "1", "OFF": "1"}
+
+
+class TransportError(client_exceptions.ClientConnectionError):
+    """The connection to the inverter failed or it answered garbage."""
+
+
+class _Connection:
+    """One keep-alive connection to an inverter."""
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+        self.closed = False
+
+    def close(self) -> None:
+        self.reusable = False
+        self.closed = True
+        self.writer.close()
+
+    async def exchange(self, request: bytes) -> tuple[int, bytes]:
+        """Send a request and return the status code and body of the response."""
+        self.writer.write(request)
+        reader = self.reader
+        head = await reader.readuntil(b"\r\n\r\n")
+        status = int(head[9:12])
+        headers = head.lower()
+        if b"connection: close" in headers or head.startswith(b"HTTP/1.0"):
+            self.reusable = False
+        if (start := headers.find(b"content-length:")) != -1:
+            end = headers.index(b"\r\n", start)
+            body = await reader.readexactly(int(headers[start + 15 : end]))
+        elif b"transfer-encoding: chunked" in headers:
+            chunks = []
+            while size := int((await reader.readuntil(b"\r\n")).split(b";")[0], 16):
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            await reader.readuntil(b"\r\n")
+            body = b"".join(chunks)
+        else:
+            self.reusable = False
+            body = await reader.read()
+        return status, body
+
+
+class EZ1Transport:
+    """Drop-in replacement for the requests APsystemsEZ1M sends to an inverter.
+
+    The request bytes of every endpoint are built once and sent over a few
+    persistent connections. Responses are parsed just far enough to find the
+    body, which maps straight onto the dataclasses of the library.
+
+    The body itself still goes through json.loads. It takes a few
+    microseconds for the small bodies of the EZ1, and scanning the fields by
+    hand saved only about one of them while breaking on any change of the
+    format.
+    """
+
+    def __init__(
+        self,
+        ip_address: str,
+        port: int = 8050,
+        timeout: float = 10,
+        max_connections: int = MAX_CONNECTIONS_PER_HOST,
+    ) -> None:
+        """Initialize the transport."""
+        self.host = ip_address
+        self.port = port
+        self.base_url = f"http://{ip_address}:{port}"
+        self.timeout = timeout
+        self._request_prefix = b"GET /"
+        self._request_suffix = (
+            f" HTTP/1.1\r\nHost: {ip_address}:{port}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode()
+        self._requests = {
+            endpoint: self._build_request(endpoint)
+            for endpoint in (
+                "getOutputData",
+                "getMaxPower",
+                "getOnOff",
+                "getAlarm",
+                "getDeviceInfo",
+            )
+        }
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle: list[_Connection] = []
+        # Idle and in use, so closing the transport can reach all of them.
+        self._open: set[_Connection] = set()
+
+    def _build_request(self, target: str) -> bytes:
+        return self._request_prefix + target.encode() + self._request_suffix
+
+    async def _exchange(self, request: bytes) -> tuple[int, bytes]:
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                async with asyncio.timeout(self.timeout):
+                    if connection is not None:
+                        try:
+                            result = await connection.exchange(request)
+                        except (asyncio.IncompleteReadError, ConnectionError):
+                            if connection.closed:
+                                # Closed by close() while waiting for the answer.
+                                raise
+                            # The inverter closed the idle connection, reconnect.
+                            self._discard(connection)
+                            connection = None
+                    if connection is None:
+                        connection = _Connection(
+                            *await asyncio.open_connection(self.host, self.port)
+                        )
+                        self._open.add(connection)
+                        result = await connection.exchange(request)
+            except TimeoutError:
+                if connection is not None:
+                    self._discard(connection)
+                raise
+            except (
+                asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError,
+                OSError,
+                ValueError,
+            ) as err:
+                if connection is not None:
+                    self._discard(connection)
+                raise TransportError(f"{self.base_url}: {err!r}") from err
+            if connection.reusable:
+                self._idle.append(connection)
+            else:
+                self._discard(connection)
+            return result
+
+    async def _request(self, request: bytes) -> dict[str, Any]:
+        for _ in range(2):
+            status, body = await self._exchange(request)
+            if status != 200:
+                raise HttpBadRequest(f"HTTP Error: {status}")
+            try:
+                response = json.loads(body)
+            except ValueError as err:
+                raise TransportError(f"{self.base_url}: {err}") from err
+            if response["message"] == "SUCCESS":
+                return response["data"]
+            # Ask once more when the inverter failed for an unknown reason.
+        raise InverterReturnedError
+
+    def _discard(self, connection: _Connection) -> None:
+        connection.close()
+        self._open.discard(connection)
+
+    def close(self) -> None:
+        """Close all connections, also those a request is waiting on."""
+        self._idle.clear()
+        while self._open:
+            self._open.pop().close()
+
+    async def get_output_data(self) -> ReturnOutputData:
+        data = await self._request(self._requests["getOutputData"])
+        return ReturnOutputData(
+            p1=data["p1"],
+            e1=data["e1"],
+            te1=data["te1"],
+            p2=data["p2"],
+            e2=data["e2"],
+            te2=data["te2"],
+        )
+
+    async def get_max_power(self) -> int | None:
+        data = await self._request(self._requests["getMaxPower"])
+        return int(data["maxPower"]) if data["maxPower"] != "" else None
+
+    async def get_device_power_status(self) -> Status:
+        data = await self._request(self._requests["getOnOff"])
+        return Status(int(data["status"]))
+
+    async def get_alarm_info(self) -> ReturnAlarmInfo:
+        data = await self._request(self._requests["getAlarm"])
+        return ReturnAlarmInfo(
+            og=Status(int(data["og"])),
+            isce1=Status(int(data["isce1"])),
+            isce2=Status(int(data["isce2"])),
+            oe=Status(int(data["oe"])),
+        )
+
+    async def get_device_info(self) -> ReturnDeviceInfo | None:
+        if not (data := await self._request(self._requests["getDeviceInfo"])):
+            return None
+        return ReturnDeviceInfo(
+            deviceId=data["deviceId"],
+            devVer=data["devVer"],
+            ssid=data["ssid"],
+            ipAddr=data["ipAddr"],
+            minPower=int(data["minPower"]),
+            maxPower=int(data["maxPower"]),
+        )
+
+    async def set_max_power(self, power_limit: int) -> int:
+        if not 30 <= power_limit <= 800:
+            raise ValueError(
+                f"Invalid setMaxPower value: expected 30 to 800, got {power_limit}"
+            )
+        data = await self._request(
+            self._build_request(f"setMaxPower?p={power_limit}")
+        )
+        return int(data["maxPower"])
+
+    async def set_device_power_status(self, power_status: Status | str) -> Status:
+        if (value := POWER_STATUS_VALUES.get(str(power_status))) is None:
+            raise ValueError(f"Invalid power status: {power_status}")
+        data = await self._request(self._build_request(f"setOnOff?status={value}"))
+        return Status(int(data["status"]))